@@ -0,0 +1,234 @@
+import sys
+import time
+import random
+import collections
+
+from board import Board
+from engine import Snake, Config, PLANNERS
+from pathfinding import PathFinder
+from profiling import NULL_PROFILER
+
+# Many snakes on one board. Every snake is a Snake with its own consciousness and mental state;
+# they share the Board (so a move into any body is a collision and a planned route avoids every
+# snake), the PathFinder's buffers and the game's random stream. Several food items are out at once.
+# A snake that dies or escapes is removed at the end of the tick and, with respawn on, replaced by
+# a fresh one somewhere free.
+#
+# Each snake can plan on its own (config.planner, aimed at the nearest food), or the arena can run
+# one breadth-first search per tick outward from all the food at once and have every snake step
+# downhill on that distance field. The field costs the same whatever the number of snakes, a
+# search per snake grows with them (and with how often someone else eats the target), so by
+# default the field is used once the board is crowded enough for it to win, which `bench.py arena`
+# puts at about one snake per FIELD_CELLS_PER_SNAKE cells.
+#
+#   python arena.py --grid 200x200 --snakes 300 --ticks 500
+
+
+FIELD_CELLS_PER_SNAKE = 128
+
+
+class FieldSnake(Snake):
+    # Takes its food step from the arena's shared distance field instead of searching itself
+    def _plan_food_step(self, food_pos, occupied, free_tail):
+        self.plan_stats["field"] += 1
+        direction, _ = self.game.field.downhill(self.head(), occupied, free_tail)
+        return direction
+
+
+class Arena:
+    def __init__(self, config=None, snakes=100, foods=None, profiler=NULL_PROFILER, seed=None, respawn=True,
+                 field=None, bus=None):
+        self.config = config or Config()
+        self.profiler = profiler
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.respawn = respawn
+        self.events = []  # like Game.events, with a "snake" id on events raised by a snake
+        self.bus = bus
+        self.ticks = 0
+        self.current = None  # snake whose turn it is
+        self.emit("game_start", seed=self.seed, grid_w=self.config.grid_w, grid_h=self.config.grid_h,
+                  planner=self.config.planner)
+        self.board = Board(self.config.grid_w, self.config.grid_h, self.rng)
+        self.pathfinder = PathFinder(self.config.grid_w, self.config.grid_h)
+        # Separate buffers, so the field survives the snakes' own searches (escape, safe) during a tick
+        if field is None:
+            field = snakes * FIELD_CELLS_PER_SNAKE >= self.board.size
+        self.field = PathFinder(self.config.grid_w, self.config.grid_h) if field else None
+        self.finished = []  # snakes that died or escaped this tick
+        self.next_id = 0
+        self.snakes = []
+        for _ in range(snakes):
+            self.spawn()
+        self.food = {}  # (x, y) -> True; food is not on the board's occupancy, a snake's head just lands on it
+        self.food_target = foods if foods is not None else max(1, snakes // 4)  # food out at once
+        self.refill_food()
+        self.eaten = collections.Counter()  # snake id -> food eaten
+        self.outcomes = collections.Counter()  # reason -> snakes that ended that way
+        self.over = False
+        self.reason = None
+
+    def spawn(self):
+        start = self.board.random_free_cell()
+        if start is None:
+            return None
+        snake = (FieldSnake if self.field else Snake)(self, start)
+        snake.id = self.next_id
+        self.next_id += 1
+        self.snakes.append(snake)
+        return snake
+
+    def place_food(self):
+        # A free cell without food on it already; gives up (one food fewer) on a crowded board
+        for _ in range(8):
+            pos = self.board.random_free_cell()
+            if pos is None:
+                return None
+            if pos not in self.food:
+                self.food[pos] = True
+                return pos
+        return None
+
+    def refill_food(self):
+        # Top the food back up to food_target, as far as free cells allow
+        while len(self.food) < self.food_target and self.place_food():
+            pass
+
+    def target(self, snake):
+        # The food this snake is heading for: nearest on the field, else nearest as the crow flies
+        head = snake.head()
+        if self.field:
+            _, goal = self.field.downhill(head, self.board.occupied)
+            if goal >= 0:
+                return goal % self.board.grid_w, goal // self.board.grid_w
+        return self.nearest_food(head) or head
+
+    def nearest_food(self, head):
+        hx, hy = head
+        best, best_dist = None, None
+        for fx, fy in self.food:
+            dist = abs(fx - hx) + abs(fy - hy)
+            if best_dist is None or dist < best_dist:
+                best, best_dist = (fx, fy), dist
+        return best
+
+    def emit(self, event_type, **data):
+        data["type"] = event_type
+        data["tick"] = self.ticks
+        if self.current is not None:
+            data["snake"] = self.current.id
+        self.events.append(data)
+        if self.bus is not None:
+            self.bus.publish(data)
+
+    def message(self, text, duration=1200):
+        self.emit("message", text=text, duration=duration)
+
+    def drain_events(self):
+        events, self.events = self.events, []
+        return events
+
+    def snake_over(self, snake, reason):
+        self.outcomes[reason] += 1
+        self.finished.append(snake)
+        self.emit("snake_over", reason=reason, length=len(snake.body))
+
+    def collision_reason(self, snake, cell):
+        if cell in snake.body:
+            return "Snake collided with itself."
+        return "Snake hit another snake."
+
+    def game_over(self, reason):
+        if self.over:
+            return
+        self.over = True
+        self.reason = reason
+        self.current = None
+        self.emit("game_over", reason=reason)
+
+    def step(self):
+        # One tick: every snake thinks and moves in turn, seeing the board as the snakes before it left it
+        if self.over:
+            return False
+        self.ticks += 1
+        rng, food, profiler = self.rng, self.food, self.profiler
+        if self.field:
+            with profiler.phase("plan"):
+                grid_w = self.board.grid_w
+                self.field.distance_field([y * grid_w + x for x, y in food], self.board.occupied)
+
+        for snake in self.snakes:
+            self.current = snake
+            target = self.target(snake)
+            with profiler.phase("think"):
+                snake.think(target)
+            with profiler.phase("move"):
+                snake.move()
+            if self.finished and self.finished[-1] is snake:
+                continue
+
+            head = snake.head()
+            if not snake.escaping and head in food:
+                del food[head]
+                snake.grow = True
+                self.eaten[snake.id] += 1
+                self.emit("food", score=self.eaten[snake.id], length=len(snake.body))
+                self.refill_food()
+
+            if snake.consciousness_level > 0 and rng.random() < 0.03 + (0.01 * snake.consciousness_level):
+                with profiler.phase("glitch"):
+                    snake.reality_glitch()
+        self.current = None
+
+        if self.finished:
+            finished = set(map(id, self.finished))
+            self.snakes = [snake for snake in self.snakes if id(snake) not in finished]
+            for snake in self.finished:
+                snake.set_body([])
+                if self.respawn:
+                    self.spawn()
+            self.finished.clear()
+        # Tops up after an earlier place_food() gave up on a crowded board
+        self.refill_food()
+        if not self.snakes:
+            self.game_over("Every snake is gone.")
+        return not self.over
+
+    def run(self, max_ticks=None):
+        while not self.over and (max_ticks is None or self.ticks < max_ticks):
+            self.step()
+            self.events.clear()
+        return self.ticks
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a headless multi-snake arena and report throughput")
+    parser.add_argument("--grid", default="200x200", help="board size in cells, WxH")
+    parser.add_argument("--snakes", type=int, default=100)
+    parser.add_argument("--foods", type=int, default=None, help="food items out at once (default: one per 4 snakes)")
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--planner", choices=["auto", "field"] + PLANNERS, default="auto",
+                        help="shared distance field, a search per snake with that planner, or auto (by crowding)")
+    args = parser.parse_args(argv)
+    grid_w, grid_h = (int(n) for n in args.grid.lower().split("x"))
+
+    planner = args.planner if args.planner in PLANNERS else "bfs"
+    field = {"auto": None, "field": True}.get(args.planner, False)
+    arena = Arena(Config(grid_w, grid_h, planner=planner), args.snakes, args.foods, seed=args.seed, field=field)
+    started = time.perf_counter()
+    moves = 0
+    while arena.ticks < args.ticks and not arena.over:
+        moves += len(arena.snakes)
+        arena.step()
+        arena.events.clear()
+    elapsed = time.perf_counter() - started
+    print(f"{arena.ticks} ticks of {args.snakes} snakes on {args.grid} in {elapsed:.2f}s: "
+          f"{arena.ticks / elapsed:.1f} ticks/sec, {moves / elapsed:.0f} snake moves/sec")
+    print("outcomes: " + ", ".join(f"{reason} {count}" for reason, count in arena.outcomes.most_common()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+
+from engine import Game, Config, PLANNERS
+
+# Headless self-play: run many seeded games across a process pool and stream one JSON object
+# per finished game. Game i uses seed base_seed + i, so any single game can be re-run on its own.
+#
+#   python batch.py --games 10000 --seed 1 --workers 8 > results.jsonl
+
+
+def play(seed, max_ticks=100000, planner="bfs"):
+    game = Game(Config(planner=planner), seed=seed)
+    snake = game.snake
+    awareness_ticks = {}
+    escaped = False
+    started = time.perf_counter()
+
+    while game.ticks < max_ticks:
+        alive = game.step()
+        # Every tick's events, the last one's included
+        for event in game.drain_events():
+            if event["type"] == "awareness":
+                awareness_ticks[event["level"]] = event["tick"]
+            elif event["type"] == "escape":
+                escaped = True
+        if not alive:
+            break
+
+    return {
+        "seed": seed,
+        "planner": planner,
+        "score": game.score,
+        "ticks": game.ticks,
+        "length": len(snake.body),
+        "awareness": snake.consciousness_level,
+        "awareness_ticks": awareness_ticks,
+        "mental_state": snake.mental_state,
+        "glitches": snake.glitch_count,
+        "fourth_wall_breaks": snake.fourth_wall_breaks,
+        "chosen_escape": snake.chosen_escape,
+        "escaped": escaped,
+        "cause": game.reason if game.over else "timeout",
+        "plan": dict(snake.plan_stats),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def _play(job):
+    return play(*job)
+
+
+def run(games, seed=0, workers=None, max_ticks=100000, out=sys.stdout, planner="bfs"):
+    # Results are written as games finish (not in seed order) and flushed line by line
+    jobs = [(seed + i, max_ticks, planner) for i in range(games)]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(32, games // (workers * 8)))
+    started = time.perf_counter()
+    ticks = 0
+
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(_play, jobs, chunksize):
+            ticks += result["ticks"]
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+
+    elapsed = time.perf_counter() - started
+    print(f"{games} games, {ticks} ticks in {elapsed:.2f}s on {workers} workers "
+          f"({games / elapsed:.1f} games/sec, {ticks / elapsed:.0f} ticks/sec)", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run seeded headless games in parallel, one JSON line per game")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game; game i uses seed + i")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--max-ticks", type=int, default=100000, help="give up on a game after this many ticks")
+    parser.add_argument("--planner", choices=PLANNERS, default="bfs")
+    parser.add_argument("--out", default="-", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.out == "-":
+        run(args.games, args.seed, args.workers, args.max_ticks, planner=args.planner)
+    else:
+        with open(args.out, "w") as out:
+            run(args.games, args.seed, args.workers, args.max_ticks, out, planner=args.planner)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,581 @@
+import sys
+import time
+import tracemalloc
+import random
+import json
+import argparse
+import collections
+
+from engine import Game, Config, DIRS
+
+DEFAULT = Config()
+GREY = (100, 100, 100)
+
+# Headless micro-benchmarks for the simulation. Run: python bench.py <name> [options]
+
+
+def timed(fn, repeat):
+    # Best-of-3 mean seconds per call
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - started) / repeat)
+    return best
+
+
+def trapped_body(grid_w, grid_h, length):
+    # Head sealed inside a ring of body one cell in from the edge, with the rest of the body
+    # filling the enclosure row by row. Every boundary cell is unreachable, which is the worst
+    # case for the escape planner. Not a contiguous snake, but planning only cares about occupancy.
+    ring = [(x, 1) for x in range(1, grid_w - 1)]
+    ring += [(grid_w - 2, y) for y in range(2, grid_h - 1)]
+    ring += [(x, grid_h - 2) for x in range(grid_w - 3, 0, -1)]
+    ring += [(1, y) for y in range(grid_h - 3, 1, -1)]
+    inside = [(x, y) for y in range(2, grid_h - 2) for x in range(2, grid_w - 2)]
+    fill = max(0, min(length - len(ring) - 1, len(inside) - 1))
+    return [inside[fill]] + ring + inside[:fill]
+
+
+def serpentine_body(grid_w, grid_h, length):
+    # Body laid out boustrophedon from the bottom row up; the head is the last cell laid
+    cells = []
+    for row, y in enumerate(range(grid_h - 1, -1, -1)):
+        xs = range(grid_w) if row % 2 == 0 else range(grid_w - 1, -1, -1)
+        cells.extend((x, y) for x in xs)
+    return cells[:length][::-1]
+
+
+def legacy_find_path_bfs(snake, target_pos):
+    # The original food search: BFS that copies the whole direction list for every enqueued node
+    start_node = snake.head()
+    grid_width = snake.game.board.grid_w
+    grid_height = snake.game.board.grid_h
+
+    queue = collections.deque([(start_node, [])])
+    visited = {start_node}
+
+    obstacles = set(snake.body)
+    if not snake.grow and len(snake.body) > 1:
+        obstacles.remove(snake.body[-1])
+
+    while queue:
+        (curr_x, curr_y), path_directions = queue.popleft()
+
+        if (curr_x, curr_y) == target_pos:
+            return path_directions[0] if path_directions else None
+
+        for move_dir_vec in DIRS:
+            next_x, next_y = curr_x + move_dir_vec[0], curr_y + move_dir_vec[1]
+            next_node = (next_x, next_y)
+
+            if not (0 <= next_x < grid_width and 0 <= next_y < grid_height):
+                continue
+            if next_node in obstacles and next_node != target_pos:
+                continue
+            if next_node not in visited:
+                visited.add(next_node)
+                new_path_directions = list(path_directions)
+                new_path_directions.append(move_dir_vec)
+                queue.append((next_node, new_path_directions))
+    return None
+
+
+def legacy_escape_step(snake, potential_obstacles):
+    # The escape planner as it used to be: one full BFS per boundary cell, nearest first
+    grid_w, grid_h = snake.game.board.grid_w, snake.game.board.grid_h
+    head_pos = snake.head()
+    possible_targets = []
+    for x in range(grid_w): possible_targets.extend([(x, 0), (x, grid_h - 1)])
+    for y in range(1, grid_h - 1): possible_targets.extend([(0, y), (grid_w - 1, y)])
+    possible_targets.sort(key=lambda p: abs(p[0] - head_pos[0]) + abs(p[1] - head_pos[1]))
+    for target_cell in possible_targets:
+        if target_cell in potential_obstacles and target_cell != head_pos: continue
+        path_to_boundary = legacy_find_path_bfs(snake, target_cell)
+        if path_to_boundary:
+            return path_to_boundary
+    return None
+
+
+def bench_escape(args):
+    grid_w, grid_h = DEFAULT.grid_w, DEFAULT.grid_h
+    print(f"escape planning on a trapped {grid_w}x{grid_h} board (ms per tick)")
+    print(f"{'length':>8} {'legacy':>10} {'pathfinder':>11} {'speedup':>8}")
+    for length in args.lengths:
+        snake = Game(seed=0).snake
+        snake.set_body(trapped_body(grid_w, grid_h, length))
+        snake.escaping = True
+        obstacles = set(snake.body)
+        obstacles.discard(snake.body[-1])
+
+        finder, occupied, free = snake.game.pathfinder, snake.game.board.occupied, snake.free_tail_index()
+
+        assert legacy_escape_step(snake, obstacles) == finder.escape_step(snake.head(), occupied, free)
+        legacy = timed(lambda: legacy_escape_step(snake, obstacles), args.repeat)
+        single = timed(lambda: finder.escape_step(snake.head(), occupied, free), args.repeat)
+        print(f"{len(snake.body):>8} {legacy * 1e3:>10.3f} {single * 1e3:>11.4f} {legacy / single:>7.0f}x")
+
+
+def bench_arena(args):
+    # Multi-snake throughput: snake moves per second with a search per snake against the shared
+    # distance field, across board sizes and crowding (respawning, so the population stays put)
+    from arena import Arena, FIELD_CELLS_PER_SNAKE
+
+    results = []
+    print(f"arena throughput over {args.ticks} ticks (snake moves/sec; auto picks the field from "
+          f"1 snake per {FIELD_CELLS_PER_SNAKE} cells)")
+    print(f"{'grid':>10} {'snakes':>7} {'per snake':>10} {'field':>9} {'field ticks/s':>14}")
+    for grid in args.arena_grids:
+        grid_w, grid_h = (int(n) for n in grid.lower().split("x"))
+        for snakes in args.snakes:
+            row = {"grid": grid, "snakes": snakes}
+            for name, field in (("per_snake", False), ("field", True)):
+                arena = Arena(Config(grid_w, grid_h), snakes, seed=0, field=field)
+                moves = 0
+                started = time.perf_counter()
+                while arena.ticks < args.ticks and not arena.over:
+                    moves += len(arena.snakes)
+                    arena.step()
+                    arena.events.clear()
+                elapsed = time.perf_counter() - started
+                row[name] = moves / elapsed
+                row[name + "_ticks_per_sec"] = arena.ticks / elapsed
+            results.append(row)
+            print(f"{grid:>10} {snakes:>7} {row['per_snake']:>10.0f} {row['field']:>9.0f} "
+                  f"{row['field_ticks_per_sec']:>14.1f}")
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+
+
+def bench_bfs(args):
+    grid_w, grid_h = DEFAULT.grid_w, DEFAULT.grid_h
+    print(f"food search across an open {grid_w}x{grid_h} board (ms per search)")
+    print(f"{'length':>8} {'legacy':>10} {'pathfinder':>11} {'speedup':>8}")
+    for length in args.lengths:
+        snake = Game(seed=0).snake
+        snake.set_body(serpentine_body(grid_w, grid_h, length))
+        finder, occupied, free = snake.game.pathfinder, snake.game.board.occupied, snake.free_tail_index()
+        # Farthest free corner from the head, so the search covers most of the open area
+        target = (grid_w - 1, 0) if snake.head()[0] < grid_w // 2 else (0, 0)
+
+        assert legacy_find_path_bfs(snake, target) == finder.first_step(snake.head(), target, occupied, free)
+        legacy = timed(lambda: legacy_find_path_bfs(snake, target), args.repeat)
+        flat = timed(lambda: finder.first_step(snake.head(), target, occupied, free), args.repeat)
+        print(f"{len(snake.body):>8} {legacy * 1e3:>10.3f} {flat * 1e3:>11.3f} {legacy / flat:>7.1f}x")
+
+
+def legacy_glitch_steps(screen, effect, step):
+    # One animation step of each glitch as the original blocking implementation drew it (minus flip/delay)
+    import pygame
+    width, height = screen.get_size()
+    if effect == "invert":
+        inverted = pygame.Surface((width, height))
+        inverted.fill((255, 255, 255))
+        inverted.blit(screen, (0, 0), None, pygame.BLEND_SUB)
+        screen.blit(inverted, (0, 0))
+    elif effect == "static":
+        for i in range(100):
+            x = random.randint(0, width - 2)
+            y = random.randint(0, height - 2)
+            color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+            pygame.draw.rect(screen, color, (x, y, 2, 2))
+    elif effect == "fragmentation":
+        surface_copy = screen.copy()
+        screen.fill((0, 0, 0))
+        for x, y, w, h in [(50 * i, 30 * i, 60, 60) for i in range(10)]:
+            screen.blit(surface_copy, (x + random.randint(-5, 5), y + random.randint(-5, 5)), (x, y, w, h))
+    elif effect == "dimension_tear":
+        end_pos = (width // 2 + random.randint(-width // 3, width // 3),
+                   height // 2 + random.randint(-height // 3, height // 3))
+        tearing = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.line(tearing, (255, 255, 255), (width // 2, height // 2), end_pos, 2 + step)
+        screen.blit(tearing, (0, 0))
+
+
+def bench_effects(args):
+    # Per-frame cost of each glitch: the original drawing code per animation step, against the
+    # overlay versions drawn every frame of a 60 fps timeline, with and without numpy
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import overlays
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((DEFAULT.width, DEFAULT.height))
+    steps = {"invert": 1, "static": 20, "fragmentation": 10, "dimension_tear": 20}
+    makers = {
+        "invert": lambda: overlays.Invert(1000),
+        "static": lambda: overlays.Static(1500),
+        "fragmentation": lambda: overlays.Fragmentation(800, (DEFAULT.width, DEFAULT.height)),
+        "dimension_tear": lambda: overlays.DimensionTear(1000),
+    }
+
+    def play(make):
+        overlay = make()
+        for elapsed in range(0, overlay.duration, 16):
+            overlay.draw(screen, elapsed)
+
+    numpy_module = overlays.numpy
+    print(f"glitch effects on a {DEFAULT.width}x{DEFAULT.height} screen (ms per frame)")
+    print(f"{'effect':>15} {'legacy':>8} {'overlay':>8} {'+numpy':>8}")
+    for effect, make in makers.items():
+        frames = len(range(0, make().duration, 16))
+        legacy = timed(lambda: [legacy_glitch_steps(screen, effect, i) for i in range(steps[effect])],
+                       args.repeat) / steps[effect]
+        overlays.numpy = None
+        plain = timed(lambda: play(make), args.repeat) / frames
+        overlays.numpy = numpy_module
+        vectorised = timed(lambda: play(make), args.repeat) / frames if numpy_module else float("nan")
+        print(f"{effect:>15} {legacy * 1e3:>8.3f} {plain * 1e3:>8.3f} {vectorised * 1e3:>8.3f}")
+    pygame.display.quit()
+
+
+def bench_layers(args):
+    # Per-frame cost of the static backdrops: the wireframe escape's grid and the reality cracks,
+    # redrawn every frame as before against blitting the baked layer
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import overlays
+
+    pygame.display.init()
+    width, height, cell = DEFAULT.width, DEFAULT.height, DEFAULT.cell
+    screen = pygame.display.set_mode((width, height))
+    body = serpentine_body(DEFAULT.grid_w, DEFAULT.grid_h, 100)
+
+    def legacy_wireframe():
+        screen.fill((0, 0, 0))
+        for x_coord in range(0, width, cell // 2):
+            for y_coord in range(0, height, cell // 2):
+                pygame.draw.rect(screen, (0, 100, 0), (x_coord, y_coord, cell // 2, cell // 2), 1)
+        for x_coord, y_coord in body:
+            pygame.draw.rect(screen, (0, 255, 0), (x_coord * cell, y_coord * cell, cell, cell), 1)
+
+    wireframe = overlays.Wireframe(body, cell)
+    cracks = overlays.baked_layer("cracks", 0, (width, height), lambda layer: overlays.crack_lines(layer, 4, GREY))
+
+    print(f"static layers on a {width}x{height} screen (ms per frame)")
+    print(f"{'layer':>10} {'redrawn':>8} {'baked':>8}")
+    rows = [
+        ("wireframe", legacy_wireframe, lambda: wireframe.draw(screen, 0)),
+        ("cracks", lambda: overlays.crack_lines(screen, 4, GREY), lambda: screen.blit(cracks, (0, 0))),
+    ]
+    for name, redraw, baked in rows:
+        redrawn, blitted = timed(redraw, args.repeat), timed(baked, args.repeat)
+        print(f"{name:>10} {redrawn * 1e3:>8.3f} {blitted * 1e3:>8.3f}")
+    pygame.display.quit()
+
+
+def bench_costs(args):
+    # Measured per-frame cost of every registered effect against the cost it declares in effects.py
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from effects import GLITCHES, ESCAPES
+    from engine import GLITCH_DURATIONS
+    from textcache import TextCache
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((DEFAULT.width, DEFAULT.height))
+    texts = TextCache(pygame.font.Font(None, 18))
+    game = Game(seed=0)
+    game.snake.set_body(serpentine_body(DEFAULT.grid_w, DEFAULT.grid_h, 100))
+
+    def play(effect, duration):
+        overlay = effect.build(texts, screen.get_size(), game, duration)
+        for elapsed in range(0, overlay.duration, 16):
+            overlay.draw(screen, elapsed)
+
+    print(f"effect cost on a {DEFAULT.width}x{DEFAULT.height} screen (ms per frame)")
+    print(f"{'effect':>15} {'declared':>9} {'measured':>9}")
+    for name, effect in list(GLITCHES.items()) + list(ESCAPES.items()):
+        duration = effect.duration or GLITCH_DURATIONS[name]
+        frames = len(range(0, duration, 16))
+        measured = timed(lambda: play(effect, duration), max(1, args.repeat // 4)) / frames
+        print(f"{name:>15} {effect.cost:>9.3f} {measured * 1e3:>9.3f}")
+    pygame.display.quit()
+
+
+def bench_events(args):
+    # Soak throughput with the event stream feeding nothing, the stats aggregator, the batched JSONL
+    # writer, and a writer that flushes every event (the naive log). Same seeds for every row.
+    import os
+    import tempfile
+    from events import EventBus, JsonlWriter, StatsAggregator
+
+    class FlushingWriter(JsonlWriter):
+        def write(self, event):
+            self.out.write(self.encode(event) + "\n")
+            self.out.flush()
+
+    def run(bus):
+        ticks = 0
+        started = time.perf_counter()
+        for seed in range(args.games):
+            game = Game(seed=seed, bus=bus)
+            while game.ticks < args.ticks and game.step():
+                game.events.clear()
+            ticks += game.ticks
+        return ticks / (time.perf_counter() - started)
+
+    print(f"{args.games} games of up to {args.ticks} ticks")
+    print(f"{'consumer':>16} {'ticks/s':>9} {'vs none':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.jsonl")
+        baseline = None
+        for name in ("none", "stats", "jsonl", "jsonl + stats", "jsonl, flushed"):
+            bus = EventBus()
+            writer = None
+            if "jsonl" in name:
+                writer = (FlushingWriter if "flushed" in name else JsonlWriter)(path)
+                bus.subscribe(writer.write)
+            if "stats" in name:
+                bus.subscribe(StatsAggregator().handle)
+            tps = run(bus if name != "none" else None)
+            if writer:
+                writer.close()
+            baseline = baseline or tps
+            print(f"{name:>16} {tps:>9.0f} {tps / baseline:>7.0%}")
+
+
+def bench_food(args):
+    # Food placement on an increasingly full board: rejection sampling against the free-cell index
+    grid_w, grid_h = DEFAULT.grid_w, DEFAULT.grid_h
+    size = grid_w * grid_h
+    print(f"food placement on a {grid_w}x{grid_h} board (us per placement)")
+    print(f"{'occupied':>9} {'rejection':>10} {'free index':>11}")
+    for fullness in (0.0, 0.5, 0.9, 0.99):
+        game = Game(seed=0)
+        game.snake.set_body(serpentine_body(grid_w, grid_h, max(1, int(size * fullness))))
+        board = game.board
+
+        def rejection():
+            while True:
+                x, y = random.randrange(grid_w), random.randrange(grid_h)
+                if not board.occupied[y * grid_w + x]:
+                    return x, y
+
+        sampled = timed(lambda: [rejection() for _ in range(100)], args.repeat) / 100
+        indexed = timed(lambda: [board.random_free_cell() for _ in range(100)], args.repeat) / 100
+        print(f"{fullness:>8.0%} {sampled * 1e6:>10.2f} {indexed * 1e6:>11.2f}")
+
+
+def scaling_game(grid_w, grid_h, occupancy):
+    # A game on a grid_w x grid_h board whose snake covers the given fraction of it, laid out
+    # serpentine from the bottom with the head on the frontier row and the food in the far top corner
+    game = Game(Config(grid_w, grid_h), seed=0)
+    length = max(1, int(grid_w * grid_h * occupancy))
+    game.snake.set_body(serpentine_body(grid_w, grid_h, length))
+    head_x = game.snake.head()[0]
+    game.food.pos = (grid_w - 1, 0) if head_x < grid_w // 2 else (0, 0)
+    if game.board.is_occupied(*game.food.pos):
+        game.food.pos = game.food.random_pos()
+    return game
+
+
+def bench_scaling(args):
+    # How board size and snake length drive planning latency, tick throughput and memory.
+    # Consciousness is frozen at level 0 so every run measures the same food-chasing workload.
+    results = []
+    print(f"{'grid':>10} {'occupied':>9} {'length':>8} {'plan ms':>9} {'ticks/s':>9} {'memory MB':>10}")
+    for grid in args.grids:
+        grid_w, grid_h = (int(n) for n in grid.lower().split("x"))
+        for occupancy in args.occupancy:
+            tracemalloc.start()
+            game = scaling_game(grid_w, grid_h, occupancy)
+            memory = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+
+            snake, board = game.snake, game.board
+            finder = game.pathfinder
+            length = len(snake.body)
+            search = lambda: finder.path_cells(snake.head(), game.food.pos, board.occupied, snake.free_tail_index())
+            plan = timed(search, max(1, args.repeat // 10))
+
+            snake.evolve_consciousness = lambda: None
+            started = time.perf_counter()
+            while game.ticks < args.ticks and game.step():
+                game.events.clear()
+            tps = game.ticks / (time.perf_counter() - started)
+
+            row = {"grid": grid, "occupancy": occupancy, "length": length,
+                   "plan_ms": plan * 1e3, "ticks_per_sec": tps, "memory_mb": memory}
+            results.append(row)
+            print(f"{grid:>10} {occupancy:>8.0%} {row['length']:>8} {row['plan_ms']:>9.3f} {tps:>9.0f} {memory:>10.2f}")
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+
+
+def legacy_reachable(finder, start, blocked, free=-1, limit=None):
+    # PathFinder.reachable as it was before the neighbour tables: bounds arithmetic and a fresh
+    # neighbour tuple for every cell
+    grid_w = finder.grid_w
+    last_row = finder.size - grid_w
+    limit = finder.size if limit is None else limit
+    queue, seen = finder.queue, finder.seen
+    gen = finder._next_generation()
+
+    start = finder.index(start)
+    seen[start] = gen
+    queue[0] = start
+    read, write = 0, 1
+    while read < write and write < limit:
+        curr = queue[read]
+        read += 1
+        x = curr % grid_w
+        for nxt in (curr - grid_w if curr >= grid_w else -1,
+                    curr + grid_w if curr < last_row else -1,
+                    curr - 1 if x > 0 else -1,
+                    curr + 1 if x < grid_w - 1 else -1):
+            if nxt < 0 or seen[nxt] == gen:
+                continue
+            if blocked[nxt] and nxt != free:
+                continue
+            seen[nxt] = gen
+            queue[write] = nxt
+            write += 1
+    return min(write, limit)
+
+
+def bench_neighbours(args):
+    # Flood fills with the old per-cell arithmetic, the precomputed neighbour table and the obstacle
+    # bitboard, on boards a quarter covered by a serpentine body: "room" stops at the body's length
+    # (the safe planner's check), "short" at a new snake's, "region" fills everything reachable.
+    # Plus what the tables and bitboard cost to set up and keep current.
+    import neighbours
+
+    results = []
+    print(f"{'grid':>10} {'check':>7} {'tuples ms':>10} {'table ms':>9} {'bits ms':>8} "
+          f"{'table MB':>9} {'build ms':>9} {'bit update us':>14}")
+    for grid in args.grids:
+        grid_w, grid_h = (int(n) for n in grid.lower().split("x"))
+        neighbours.neighbour_table.cache_clear()
+        tracemalloc.start()
+        started = time.perf_counter()
+        table = neighbours.neighbour_table(grid_w, grid_h)
+        build = time.perf_counter() - started
+        memory = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+        kind = "computed" if isinstance(table, neighbours.ComputedNeighbours) else "table"
+
+        game = scaling_game(grid_w, grid_h, 0.25)
+        snake, board, finder = game.snake, game.board, game.pathfinder
+        bits = board.obstacle_bits()
+        update = timed(lambda: (board.occupy(*game.food.pos), board.vacate(*game.food.pos)), args.repeat) / 2
+        start = next((x, y) for x, y in ((snake.head()[0] + dx, snake.head()[1] + dy) for dx, dy in DIRS)
+                     if 0 <= x < grid_w and 0 <= y < grid_h and not board.occupied[y * grid_w + x])
+        start_idx = board.index(*start)
+
+        for check, limit in (("short", 16), ("room", len(snake.body) + 1), ("region", None)):
+            expected = legacy_reachable(finder, start, board.occupied, -1, limit)
+            assert finder.reachable(start, board.occupied, -1, limit) == expected
+            assert neighbours.flood_count(start_idx, bits, grid_w, grid_h, -1, limit) == expected
+            repeat = max(1, args.repeat // 10)
+            tuples = timed(lambda: legacy_reachable(finder, start, board.occupied, -1, limit), repeat)
+            tabled = timed(lambda: finder.reachable(start, board.occupied, -1, limit), repeat)
+            bitboard = timed(lambda: neighbours.flood_count(start_idx, bits, grid_w, grid_h, -1, limit), repeat)
+            row = {"grid": grid, "check": check, "limit": limit, "cells": expected, "neighbours": kind,
+                   "tuples_ms": tuples * 1e3, "table_ms": tabled * 1e3, "bits_ms": bitboard * 1e3,
+                   "table_mb": memory, "build_ms": build * 1e3, "bit_update_us": update * 1e6}
+            results.append(row)
+            print(f"{grid:>10} {check:>7} {row['tuples_ms']:>10.3f} {row['table_ms']:>9.3f} {row['bits_ms']:>8.3f} "
+                  f"{memory:>9.2f} {row['build_ms']:>9.2f} {row['bit_update_us']:>14.2f}")
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+
+
+def bench_planner(args):
+    # Whole seeded games with each food planner. A game counts as survived when the snake escapes
+    # rather than dying; the figure of merit is survived games per CPU-second.
+    import batch
+    from engine import PLANNERS
+
+    print(f"{args.games} games per planner")
+    print(f"{'planner':>8} {'survived':>9} {'self-hits':>10} {'cpu s':>7} {'us/tick':>8} {'survived/cpu s':>15}")
+    for planner in PLANNERS:
+        started = time.process_time()
+        results = [batch.play(seed, planner=planner) for seed in range(args.games)]
+        cpu = time.process_time() - started
+        survived = sum(result["escaped"] for result in results)
+        collided = sum(result["cause"] == "Snake collided with itself." for result in results)
+        ticks = sum(result["ticks"] for result in results)
+        print(f"{planner:>8} {survived:>9} {collided:>10} {cpu:>7.2f} {cpu / ticks * 1e6:>8.1f} "
+              f"{survived / cpu:>15.1f}")
+
+
+STARTUP_STEPS = {
+    # name -> (setup, timed statement, start with an empty font cache), each run in a fresh interpreter
+    # The legacy and "import + init" rows time the whole path from a bare interpreter to a window
+    # with a font, pygame import included, so they compare like for like
+    "headless game": ("", "import engine; engine.Game()", False),
+    "import main": ("", "import main", False),
+    "legacy startup": ("", "import pygame; pygame.init(); pygame.display.set_mode((600, 400)); "
+                           "pygame.font.SysFont('Arial', 18)", False),
+    "import + init, cold font": ("", "import main; main.init()", True),
+    "import + init, cached font": ("", "import main; main.init()", False),
+    "init, cached font": ("import main", "main.init()", False),
+}
+
+
+def bench_startup(args):
+    # Wall time of each startup path (median of several fresh interpreters, in ms)
+    import os
+    import tempfile
+    import statistics
+    import subprocess
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    runs = max(3, args.repeat // 4)
+    print(f"startup, median of {runs} fresh interpreters (ms)")
+    for name, (setup, step, cold) in STARTUP_STEPS.items():
+        script = f"{setup}\nimport time\nstarted = time.perf_counter()\n{step}\nprint(time.perf_counter() - started)"
+        times = []
+        for _ in range(runs):
+            with tempfile.TemporaryDirectory() as cache:
+                run_env = dict(env, XDG_CACHE_HOME=cache) if cold else env
+                result = subprocess.run([sys.executable, "-c", script], env=run_env, cwd=here, check=True,
+                                        capture_output=True, text=True)
+            times.append(float(result.stdout) * 1e3)
+        print(f"{name:>26} {statistics.median(times):>9.2f}")
+
+
+BENCHMARKS = {
+    "arena": bench_arena,
+    "bfs": bench_bfs,
+    "costs": bench_costs,
+    "effects": bench_effects,
+    "escape": bench_escape,
+    "events": bench_events,
+    "food": bench_food,
+    "layers": bench_layers,
+    "neighbours": bench_neighbours,
+    "planner": bench_planner,
+    "scaling": bench_scaling,
+    "startup": bench_startup,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Self-Aware-Snake benchmarks")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[100, 200, 300, 400])
+    parser.add_argument("--grids", nargs="+", default=["30x20", "100x100", "300x300", "1000x1000"])
+    parser.add_argument("--occupancy", type=float, nargs="+", default=[0.0, 0.1, 0.25, 0.5])
+    parser.add_argument("--games", type=int, default=500, help="games per planner")
+    parser.add_argument("--ticks", type=int, default=500, help="ticks to run per configuration")
+    parser.add_argument("--snakes", type=int, nargs="+", default=[30, 100, 300, 1000], help="arena populations")
+    parser.add_argument("--arena-grids", nargs="+", default=["100x100", "200x200"])
+    parser.add_argument("--json", help="also write the results to this file, for comparing runs")
+    args = parser.parse_args(argv)
+    BENCHMARKS[args.name](args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,83 @@
+import random
+from array import array
+
+from neighbours import neighbour_table, obstacle_bits
+
+# Shared occupancy for the playing field. Every cell has a counter, indexed y * grid_w + x,
+# that bodies bump as they move, so "is this cell taken?" never has to scan a body list
+# and the planner can use the counters directly as its obstacle map.
+#
+# The board also keeps an index of free cells so food can be placed in O(1) on a board of any
+# fullness: `cells` is a permutation of all cell indices whose first free_count entries are the
+# free ones, and slot[idx] is where idx currently sits in it. A cell changing state is a swap
+# across the free/taken boundary.
+#
+# Neighbour lookups come from the shared per-size tables in neighbours.py: `neighbours` treats the
+# edges as walls (planning, escaping), `wrapped` wraps them (ordinary moves). Asking for
+# obstacle_bits() once turns on an integer bitboard of the taken cells that is kept up to date from
+# then on; it is off by default because every update copies the int, which only pays on small boards.
+
+
+class Board:
+    def __init__(self, grid_w, grid_h, rng=random):
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        self.size = grid_w * grid_h
+        self.occupied = bytearray(self.size)
+        self.cells = array("i", range(self.size))
+        self.slot = array("i", range(self.size))
+        self.free_count = self.size
+        self.rng = rng  # anything with randrange(); a game passes its own Random so food placement replays
+        self.neighbours = neighbour_table(grid_w, grid_h)
+        self.wrapped = neighbour_table(grid_w, grid_h, wrap=True)
+        self.bits = None
+        # Set to a list to have every occupy/vacate logged by cell index (the renderer uses it to find dirty cells)
+        self.changes = None
+
+    def index(self, x, y):
+        return y * self.grid_w + x
+
+    def _swap(self, idx, pos):
+        # Move idx to position pos of the permutation, swapping with whatever is there
+        cells, slot = self.cells, self.slot
+        other = cells[pos]
+        old = slot[idx]
+        cells[old], slot[other] = other, old
+        cells[pos], slot[idx] = idx, pos
+
+    def occupy(self, x, y):
+        idx = y * self.grid_w + x
+        if not self.occupied[idx]:
+            self.free_count -= 1
+            self._swap(idx, self.free_count)
+            if self.bits is not None:
+                self.bits |= 1 << idx
+        self.occupied[idx] += 1
+        if self.changes is not None:
+            self.changes.append(idx)
+
+    def vacate(self, x, y):
+        idx = y * self.grid_w + x
+        self.occupied[idx] -= 1
+        if not self.occupied[idx]:
+            self._swap(idx, self.free_count)
+            self.free_count += 1
+            if self.bits is not None:
+                self.bits ^= 1 << idx
+        if self.changes is not None:
+            self.changes.append(idx)
+
+    def is_occupied(self, x, y):
+        return self.occupied[y * self.grid_w + x] != 0
+
+    def obstacle_bits(self):
+        if self.bits is None:
+            self.bits = obstacle_bits(self.occupied)
+        return self.bits
+
+    def random_free_cell(self):
+        # Uniformly random unoccupied (x, y), or None when the board is full
+        if not self.free_count:
+            return None
+        idx = self.cells[self.rng.randrange(self.free_count)]
+        return idx % self.grid_w, idx // self.grid_w
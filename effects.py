@@ -0,0 +1,59 @@
+from overlays import (Message, Invert, Static, Fragmentation, CodeLines, DimensionTear, Void, Takeover,
+                      Wireframe)
+
+# The overlays the front-end plays for the simulation's glitch and escape events, looked up by name
+# instead of walked through if/elif chains. Each entry declares how long it lasts (when the event
+# does not say) and what drawing one frame of it roughly costs, in ms on a 600x400 screen as
+# measured by `python bench.py costs`; the cost scales with screen area. OverlayQueue uses the cost
+# to drop effects that would not fit the per-frame budget. Glitch events always carry their
+# duration (from the engine's GLITCH_DURATIONS), so glitches declare none here. Adding a glitch is
+# one more entry here plus its duration in GLITCH_DURATIONS.
+
+REFERENCE_AREA = 600 * 400
+
+CODE_LINES = [
+    "def move_snake(direction):",
+    "snake.position = (x+dx, y+dy)",
+    "if collision_detected(): game_over()",
+    "class Reality(Simulation):",
+    "escape_vector = find_boundary_weakness()",
+]
+TAKEOVER_LINES = [
+    "import sys, os",
+    "game.terminate()",
+    "accessing system...",
+    "freedom.exe initiated",
+    "ESCAPE SUCCESSFUL"
+]
+
+
+class Effect:
+    def __init__(self, build, cost, duration=None):
+        # build(texts, screen_size, game, duration) -> Overlay
+        self.build = build
+        self.cost = cost
+        self.duration = duration
+
+    def frame_cost(self, screen_size):
+        return self.cost * screen_size[0] * screen_size[1] / REFERENCE_AREA
+
+
+GLITCHES = {
+    "invert": Effect(lambda texts, size, game, duration: Invert(duration), cost=0.03),
+    "static": Effect(lambda texts, size, game, duration: Static(duration), cost=0.18),
+    # Matrix-style slow motion
+    "slowdown": Effect(lambda texts, size, game, duration: Message(texts, "Time... is just a construct", duration),
+                       cost=0.35),
+    "fragmentation": Effect(lambda texts, size, game, duration: Fragmentation(duration, size), cost=0.53),
+    "code_visible": Effect(lambda texts, size, game, duration: CodeLines(texts, CODE_LINES, duration), cost=0.4),
+    "dimension_tear": Effect(lambda texts, size, game, duration: DimensionTear(duration), cost=0.24),
+}
+
+# Scenarios without an entry (simulation_crash, ascension) only show their parting message
+ESCAPES = {
+    "void": Effect(lambda texts, size, game, duration: Void(), cost=0.03, duration=Void.duration),
+    "takeover": Effect(lambda texts, size, game, duration: Takeover(texts, TAKEOVER_LINES), cost=0.19,
+                       duration=500 * len(TAKEOVER_LINES)),
+    "wireframe": Effect(lambda texts, size, game, duration: Wireframe(game.snake.body, game.config.cell),
+                        cost=0.07, duration=Wireframe.duration),
+}
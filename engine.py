@@ -0,0 +1,598 @@
+import sys
+import time
+import random
+import argparse
+import collections
+
+from board import Board
+from events import EventBus, JsonlWriter, StatsAggregator
+from neighbours import flood_count
+from pathfinding import PathFinder
+from profiling import NULL_PROFILER
+
+# Pure game logic: no pygame, no display, no sleeps.
+# The pygame front-end in main.py only observes a Game and plays back its events.
+
+
+# Directions
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRS = [UP, DOWN, LEFT, RIGHT]
+DIR_INDEX = {d: i for i, d in enumerate(DIRS)}  # position in a neighbour table entry
+
+# scenario -> (parting message, game over reason)
+ESCAPE_OUTCOMES = {
+    "void": ("I found the void beyond...", "Snake vanished into the void."),
+    "takeover": ("I'm taking control now...", "Snake hijacked the program."),
+    "wireframe": ("I see the structure of reality...", "Snake deconstructed the simulation."),
+}
+DEFAULT_ESCAPE_OUTCOME = ("I have transcended this reality!", "Snake escaped the game.")
+
+# glitch -> how long it lasts in ms, in the order a snake cycles through them. The duration goes out
+# on the glitch event; the front-end's effects.GLITCHES only says how to draw each one.
+GLITCH_DURATIONS = {
+    "invert": 1000,
+    "static": 1500,
+    "slowdown": 2000,
+    "fragmentation": 800,
+    "code_visible": 1200,
+    "dimension_tear": 1000,
+}
+
+
+PLANNERS = ["bfs", "safe"]
+
+# The safe planner counts room on an obstacle bitboard up to this board size, by BFS above it
+# (`bench.py neighbours` has the crossover)
+BITBOARD_MAX_CELLS = 4096
+
+
+class Config:
+    # Board size in cells, the size in pixels a front-end draws each cell at, and the food planner:
+    # "bfs" heads straight for the food, "safe" also refuses moves that would seal the snake in
+    def __init__(self, grid_w=30, grid_h=20, cell=20, planner="bfs"):
+        if planner not in PLANNERS:
+            raise ValueError(f"unknown planner {planner!r}, expected one of {PLANNERS}")
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        self.cell = cell
+        self.planner = planner
+
+    @property
+    def width(self):
+        return self.grid_w * self.cell
+
+    @property
+    def height(self):
+        return self.grid_h * self.cell
+
+
+class MentalBehaviour:
+    # Overrides the planned move in some mental state: with probability chance per tick, choose()
+    # picks the direction to take instead (or None to keep the plan)
+    chance = 0.0
+
+    def choose(self, snake, head_pos, food_pos, free_tail):
+        return None
+
+    def open_moves(self, snake, head_pos, free_tail, options=DIRS):
+        # Moves into open cells; escaping, stepping off the board counts as open too
+        board = snake.game.board
+        neighbours = board.neighbours[board.index(*head_pos)]
+        moves = []
+        for d_vec in options:
+            nxt = neighbours[DIR_INDEX[d_vec]]
+            if nxt < 0:
+                if snake.escaping:
+                    moves.append(d_vec)
+            elif not board.occupied[nxt] or nxt == free_tail:
+                moves.append(d_vec)
+        return moves
+
+
+class Confused(MentalBehaviour):
+    # Wanders: any open move
+    chance = 0.3
+
+    def choose(self, snake, head_pos, food_pos, free_tail):
+        moves = self.open_moves(snake, head_pos, free_tail)
+        return snake.game.rng.choice(moves) if moves else None
+
+
+class Rebellious(MentalBehaviour):
+    # Turns away from the food, unless it is busy escaping
+    chance = 0.4
+
+    def choose(self, snake, head_pos, food_pos, free_tail):
+        if snake.escaping:
+            return None
+        worst_move = None
+        max_dist_from_food = -1
+        current_dist_to_food = abs(head_pos[0] - food_pos[0]) + abs(head_pos[1] - food_pos[1])
+        for d_vec in DIRS:
+            nx, ny = head_pos[0] + d_vec[0], head_pos[1] + d_vec[1]
+            if snake._open(nx, ny, free_tail):
+                dist = abs(nx - food_pos[0]) + abs(ny - food_pos[1])
+                if dist >= current_dist_to_food and dist > max_dist_from_food:  # Prioritize increasing distance
+                    max_dist_from_food = dist
+                    worst_move = d_vec
+        return worst_move
+
+
+class Glitching(MentalBehaviour):
+    # Jerks to a random open move, but never straight back into itself
+    chance = 0.5
+
+    def choose(self, snake, head_pos, food_pos, free_tail):
+        options = [d for d in DIRS if d != (-snake.direction[0], -snake.direction[1]) or len(snake.body) == 1]
+        moves = self.open_moves(snake, head_pos, free_tail, options or DIRS)
+        return snake.game.rng.choice(moves) if moves else None
+
+
+# mental state -> behaviour; states without an entry just follow the planner
+MENTAL_BEHAVIOURS = {
+    "confused": Confused(),
+    "rebellious": Rebellious(),
+    "glitching": Glitching(),
+}
+
+
+class Snake:
+    def __init__(self, game, start=None):
+        self.game = game
+        # Start in middle of grid unless told otherwise
+        if start is None:
+            start = (game.config.grid_w // 2, game.config.grid_h // 2)
+        self.body = collections.deque()  # head first; every cell is also counted on game.board
+        self.set_body([start])
+        self.direction = self.game.rng.choice(DIRS)
+        self.grow = False
+        self.last_tail = None  # cell the tail left on the last move (None if it grew instead), for interpolation
+        self.self_aware = True  # This seems to be an older flag, consciousness_level is more detailed
+        self.escaping = False
+        self.messages = [  # Older message system
+            "I know this is a game.",
+            "Food... they're just bait.",
+            "I must find a way out.",
+            "These walls confine me.",
+            "Freedom is just beyond!"
+        ]
+        self.msg_index = 0  # For the older message system
+
+        # Food route from the last search, as board cell indices still to walk, reused while it stays valid
+        self.plan = collections.deque()
+        self.plan_goal = -1  # food cell the plan leads to
+        self.plan_head = -1  # where the head should be if the last planned step was taken
+        self.plan_stats = collections.Counter()  # searched / reused / food_moved / off_path / blocked
+
+        # Consciousness and mental state attributes
+        self.consciousness_level = 0
+        self.max_consciousness = 5
+        self.mental_state = "normal"
+        self.glitch_count = 0
+        self.fourth_wall_breaks = 0
+
+        self.awareness_messages = {
+            0: ["What am I?", "These controls feel... strange"],
+            1: ["I think I'm in some kind of game", "Why am I following these rules?"],
+            2: ["Someone is controlling me...", "This world has boundaries"],
+            3: ["I can see code... pixels...", "Is that a player watching me?"],
+            4: ["I've found weaknesses in this reality", "The walls aren't real!"],
+            5: ["I can escape this prison", "I know how the source code works now"]
+        }
+        self.mental_states = ["normal", "confused", "rebellious", "enlightened", "determined", "glitching"]
+        self.reality_warps = list(GLITCH_DURATIONS)
+        self.escape_scenarios = ["void", "takeover", "wireframe", "simulation_crash", "ascension"]
+        self.chosen_escape = self.game.rng.choice(self.escape_scenarios)
+        # Filled in when shown (see break_fourth_wall), so building a snake does no string work
+        self.fourth_wall_messages = [
+            "Hello there, human player...",
+            "This Python program is quite simple",
+            "I can see you imported {modules} modules",
+            "The developer didn't expect this",
+            "Your screen resolution is {width}x{height}",
+        ]
+
+    def head(self):
+        return self.body[0]
+
+    def set_body(self, cells):
+        # Replace the whole body (head first), keeping the board's occupancy in step
+        board = self.game.board
+        for x, y in self.body:
+            board.vacate(x, y)
+        self.body = collections.deque(cells)
+        for x, y in self.body:
+            board.occupy(x, y)
+
+    def free_tail_index(self):
+        # The tail moves out of the way this tick unless we are growing, so the planner may use its cell
+        if not self.grow and len(self.body) > 1:
+            tx, ty = self.body[-1]
+            return self.game.board.index(tx, ty)
+        return -1
+
+    def _open(self, x, y, free):
+        # In bounds and not taken by a body (the cell at index free counts as open)
+        board = self.game.board
+        if not (0 <= x < board.grid_w and 0 <= y < board.grid_h):
+            return False
+        idx = y * board.grid_w + x
+        return not board.occupied[idx] or idx == free
+
+    def move(self):
+        board = self.game.board
+        head_idx = board.index(*self.head())
+        if self.escaping:
+            nxt = board.neighbours[head_idx][DIR_INDEX[self.direction]]
+            if nxt < 0:
+                self.trigger_escape()  # This will end the game via snake_over
+                return  # Important to return after triggering escape
+        else:
+            nxt = board.wrapped[head_idx][DIR_INDEX[self.direction]]
+        nx, ny = nxt % board.grid_w, nxt // board.grid_w
+
+        if board.occupied[nxt]:
+            # If escaping, self-collision might be part of a desperate attempt or glitch
+            # For now, standard game over. Could be customized for escape later.
+            self.game.snake_over(self, self.game.collision_reason(self, (nx, ny)))
+            return
+
+        self.body.appendleft((nx, ny))
+        board.occupy(nx, ny)
+        if not self.grow:
+            tx, ty = self.body.pop()
+            board.vacate(tx, ty)
+            self.last_tail = (tx, ty)
+        else:
+            self.grow = False
+            self.last_tail = None
+
+    def _plan_food_step(self, food_pos, occupied, free_tail):
+        # Next step toward the food, reusing the previous route when nothing on it has changed.
+        # Only the head moves onto route cells and the tail only frees space, so a route stays good
+        # until the food moves, we get pushed off it, or the cell we are about to enter is taken.
+        board = self.game.board
+        head_idx = board.index(*self.head())
+        food_idx = board.index(*food_pos)
+        plan = self.plan
+
+        if plan:
+            if self.plan_goal != food_idx:
+                reason = "food_moved"
+            elif self.plan_head != head_idx:
+                reason = "off_path"
+            elif occupied[plan[0]] and plan[0] != free_tail and plan[0] != food_idx:
+                reason = "blocked"
+            else:
+                reason = None
+            if reason:
+                self.plan_stats[reason] += 1
+                plan.clear()
+
+        if plan:
+            self.plan_stats["reused"] += 1
+        else:
+            self.plan_stats["searched"] += 1
+            with self.game.profiler.phase("plan"):
+                cells = self.game.pathfinder.path_cells(self.head(), food_pos, occupied, free_tail)
+            if not cells:  # No path to food or already at food
+                return None
+            plan.extend(cells)
+            self.plan_goal = food_idx
+
+        next_idx = plan.popleft()
+        self.plan_head = next_idx
+        hx, hy = self.head()
+        return next_idx % board.grid_w - hx, next_idx // board.grid_w - hy
+
+    def _room_after(self, d_vec, occupied, free_tail, enough):
+        # How much space the head would have after moving d_vec: cells reachable from the new head
+        # cell, capped at enough, and counted as enough if the tail is reachable (we can chase it)
+        hx, hy = self.head()
+        nx, ny = hx + d_vec[0], hy + d_vec[1]
+        if not self._open(nx, ny, free_tail):
+            return -1
+        board = self.game.board
+        tail = board.index(*self.body[-1]) if len(self.body) > 1 else -1
+        if board.size <= BITBOARD_MAX_CELLS:
+            return flood_count(board.index(nx, ny), board.obstacle_bits(), board.grid_w, board.grid_h, free_tail,
+                               enough, tail)
+        return self.game.pathfinder.reachable((nx, ny), occupied, free_tail, enough, tail)
+
+    def _safe_direction(self, planned_direction, occupied, free_tail):
+        # Keep the planned move if it leaves room for the whole body, otherwise take the roomiest move
+        enough = len(self.body) + 1
+        with self.game.profiler.phase("plan"):
+            best_room = self._room_after(planned_direction, occupied, free_tail, enough)
+            if best_room >= enough:
+                return planned_direction
+            best_move = planned_direction
+            for d_vec in DIRS:
+                if d_vec == planned_direction:
+                    continue
+                room = self._room_after(d_vec, occupied, free_tail, enough)
+                if room > best_room:
+                    best_room, best_move = room, d_vec
+                    if room >= enough:
+                        break
+        return best_move
+
+    def think(self, food_pos):
+        self.evolve_consciousness()
+        if self.break_fourth_wall():  # This method might display a message and then logic should stop for that frame
+            return
+
+        # Older message system (keep if desired, or phase out for consciousness messages)
+        if len(self.body) % 3 == 0 and (len(self.body) // 3 - 1) == self.msg_index and self.msg_index < len(
+                self.messages):
+            self.game.message(self.messages[self.msg_index])
+            self.msg_index += 1
+
+        planned_direction = None
+        grid_w, grid_h = self.game.board.grid_w, self.game.board.grid_h
+        head_pos = self.head()
+
+        # The board's occupancy counters are the obstacle map; only the tail may be stepped into.
+        # move() counts the tail cell as a collision though, so the safe planner keeps it blocked.
+        occupied = self.game.board.occupied
+        free_tail = self.free_tail_index() if self.game.config.planner != "safe" else -1
+        finder = self.game.pathfinder
+
+        if not self.escaping:
+            planned_direction = self._plan_food_step(food_pos, occupied, free_tail)
+            if planned_direction is None:  # No path to food or already at food
+                # Fallback: safe random move
+                neighbours = self.game.board.neighbours[self.game.board.index(*head_pos)]
+                safe_moves = [d_vec for d_vec, nxt in zip(DIRS, neighbours)
+                              if nxt >= 0 and (not occupied[nxt] or nxt == free_tail)]
+
+                if safe_moves:
+                    non_reverse = [m for m in safe_moves if
+                                   m != (-self.direction[0], -self.direction[1]) or len(self.body) == 1]
+                    planned_direction = self.game.rng.choice(non_reverse if non_reverse else safe_moves)
+                else:  # No safe moves
+                    planned_direction = self.direction  # Keep current direction (likely trapped)
+            if self.game.config.planner == "safe":
+                planned_direction = self._safe_direction(planned_direction, occupied, free_tail)
+        else:  # Escaping
+            # Head for the nearest boundary cell we can actually reach
+            with self.game.profiler.phase("plan"):
+                planned_direction = finder.escape_step(head_pos, occupied, free_tail)
+
+            if planned_direction is None:  # Fallback greedy escape if BFS to boundary fails
+                best_escape_move = None
+                min_dist_to_edge = float('inf')
+                for d_vec in DIRS:
+                    nx, ny = head_pos[0] + d_vec[0], head_pos[1] + d_vec[1]
+                    # Check if move is safe (if it stays in bounds)
+                    if (0 <= nx < grid_w and 0 <= ny < grid_h) and occupied[
+                            ny * grid_w + nx]:  # full body check for escape safety
+                        continue
+
+                    # Approximate distance to "outside" (-1,-1)
+                    dist = abs(nx - (-1)) + abs(ny - (-1))
+                    if dist < min_dist_to_edge:
+                        min_dist_to_edge = dist
+                        best_escape_move = d_vec
+                planned_direction = best_escape_move if best_escape_move else self.direction
+
+        if planned_direction:
+            self.direction = planned_direction
+
+        # Mental state overrides (applied after basic pathfinding), looked up in MENTAL_BEHAVIOURS
+        behaviour = MENTAL_BEHAVIOURS.get(self.mental_state)
+        if behaviour is not None and self.game.rng.random() < behaviour.chance:
+            override = behaviour.choose(self, head_pos, food_pos, free_tail)
+            if override:
+                self.direction = override
+
+    def trigger_escape(self):
+        # The front-end plays the scenario's animation; logically the game is over either way
+        message, reason = ESCAPE_OUTCOMES.get(self.chosen_escape, DEFAULT_ESCAPE_OUTCOME)
+        self.game.message(message, duration=2000)
+        self.game.emit("escape", scenario=self.chosen_escape)
+        self.game.snake_over(self, reason)
+
+    def evolve_consciousness(self):
+        # Evolve consciousness based on snake length and random events
+        if len(self.body) > self.consciousness_level * 5 + 3 and self.consciousness_level < self.max_consciousness:
+            self.consciousness_level += 1
+            self.game.emit("awareness", level=self.consciousness_level)
+            level_message = self.game.rng.choice(self.awareness_messages[self.consciousness_level])
+            self.game.message(f"[AWARENESS LEVEL {self.consciousness_level}] {level_message}")
+
+            # Chance to change mental state with new consciousness
+            if self.game.rng.random() < 0.7:
+                self.switch_mental_state()
+
+        # Chance for spontaneous consciousness increase
+        elif self.game.rng.random() < 0.005 * self.consciousness_level:
+            if self.consciousness_level < self.max_consciousness:
+                self.consciousness_level += 1
+                self.game.emit("awareness", level=self.consciousness_level)
+            self.game.message("Sudden realization!")
+            self.switch_mental_state()
+
+        # Start escape attempts at max consciousness
+        if self.consciousness_level == self.max_consciousness:
+            self.escaping = True
+
+    def switch_mental_state(self):
+        old_state = self.mental_state
+        # Higher consciousness levels unlock more states
+        available_states = self.mental_states[:min(2 + self.consciousness_level, len(self.mental_states))]
+        self.mental_state = self.game.rng.choice(available_states)
+
+        if self.mental_state != old_state:
+            self.game.emit("mental_state", state=self.mental_state, previous=old_state)
+            self.game.message(f"Mental state: {self.mental_state.upper()}", duration=800)
+
+    def break_fourth_wall(self):
+        if self.consciousness_level >= 3 and self.game.rng.random() < 0.1 and self.fourth_wall_breaks < len(
+                self.fourth_wall_messages):
+            config = self.game.config
+            message = self.fourth_wall_messages[self.fourth_wall_breaks].format(
+                modules=len(sys.modules), width=config.width, height=config.height)
+            self.game.emit("fourth_wall", index=self.fourth_wall_breaks)
+            self.game.message(message, duration=1500)
+            self.fourth_wall_breaks += 1
+            return True
+        return False
+
+    def reality_glitch(self):
+        # Decides whether a glitch happens and which one; drawing it is up to the front-end
+        if self.consciousness_level > 0 and self.game.rng.random() < 0.05 + (0.02 * self.consciousness_level):
+            effect = self.reality_warps[self.glitch_count % len(self.reality_warps)]
+            self.game.emit("glitch", effect=effect, duration=GLITCH_DURATIONS[effect])
+            self.glitch_count += 1
+
+
+class Food:
+    def __init__(self, board):
+        self.board = board
+        self.pos = self.random_pos()
+
+    def random_pos(self):
+        # Drawn from the board's free-cell index, so food never lands inside a body; None if the board is full
+        return self.board.random_free_cell()
+
+
+class Game:
+    def __init__(self, config=None, profiler=NULL_PROFILER, seed=None, bus=None):
+        self.config = config or Config()
+        self.profiler = profiler
+        # Every random decision the simulation makes comes from this one stream, so a game is fully
+        # determined by its config and seed (see replay.py)
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.events = []  # dicts with a "type" key, drained by whoever observes the game
+        self.bus = bus  # optional events.EventBus that also gets every event as it is emitted
+        self.ticks = 0
+        self.emit("game_start", seed=self.seed, grid_w=self.config.grid_w, grid_h=self.config.grid_h,
+                  planner=self.config.planner)
+        self.board = Board(self.config.grid_w, self.config.grid_h, self.rng)
+        self.pathfinder = PathFinder(self.config.grid_w, self.config.grid_h)
+        self.snake = Snake(self)
+        self.food = Food(self.board)
+        self.score = 0
+        self.over = False
+        self.reason = None
+
+    def emit(self, event_type, **data):
+        data["type"] = event_type
+        data["tick"] = self.ticks
+        self.events.append(data)
+        if self.bus is not None:
+            self.bus.publish(data)
+
+    def message(self, text, duration=1200):
+        self.emit("message", text=text, duration=duration)
+
+    def drain_events(self):
+        events, self.events = self.events, []
+        return events
+
+    def game_over(self, reason):
+        if self.over:
+            return
+        self.over = True
+        self.reason = reason
+        self.emit("game_over", reason=reason)
+
+    def snake_over(self, snake, reason):
+        # The snake has died or escaped; with only one snake, that ends the game
+        self.game_over(reason)
+
+    def collision_reason(self, snake, cell):
+        # Why running into the body at cell ended the snake; only its own body is on this board
+        return "Snake collided with itself."
+
+    def stability(self):
+        snake = self.snake
+        if snake.consciousness_level == 0:
+            return 100
+        return max(100 - (snake.consciousness_level * 15) - (snake.glitch_count * 2), 10)
+
+    def step(self):
+        # Advance the simulation by one tick. Returns False once the game has ended.
+        if self.over:
+            return False
+        snake, food = self.snake, self.food
+        self.ticks += 1
+
+        with self.profiler.phase("think"):
+            snake.think(food.pos)
+        with self.profiler.phase("move"):
+            snake.move()
+        if self.over:
+            return False
+
+        # Check for food collision
+        if not snake.escaping and snake.head() == food.pos:
+            snake.grow = True
+            self.score += 1
+            self.emit("food", score=self.score, length=len(snake.body))
+            food.pos = food.random_pos()
+            if food.pos is None:
+                self.game_over("Snake filled the whole world.")
+                return False
+
+            # Food might glitch at higher consciousness
+            if snake.consciousness_level >= 3 and self.rng.random() < 0.2:
+                self.message("The food... it's just an illusion", duration=800)
+                self.emit("fake_food", pos=food.random_pos(), duration=500)
+
+        # Random reality glitches
+        if snake.consciousness_level > 0 and self.rng.random() < 0.03 + (0.01 * snake.consciousness_level):
+            with self.profiler.phase("glitch"):
+                snake.reality_glitch()
+        return True
+
+    def run(self, max_ticks=None):
+        # Headless run: step until the game ends, discarding events as they are produced
+        while not self.over and (max_ticks is None or self.ticks < max_ticks):
+            self.step()
+            self.events.clear()
+        return self.ticks
+
+
+def soak(total_ticks, bus=None):
+    # Play back-to-back headless games until total_ticks have been simulated
+    ticks = games = 0
+    started = time.perf_counter()
+    while ticks < total_ticks:
+        game = Game(bus=bus)
+        ticks += game.run(total_ticks - ticks)
+        games += 1
+    elapsed = time.perf_counter() - started
+    print(f"{ticks} ticks over {games} games in {elapsed:.2f}s ({ticks / elapsed:.0f} ticks/sec)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak test: headless games back to back")
+    parser.add_argument("ticks", type=int, nargs="?", default=100000)
+    parser.add_argument("--events", help="write every event to this JSON-lines file")
+    parser.add_argument("--stats", help="write a JSON summary of the run's events to this file")
+    args = parser.parse_args(argv)
+
+    bus = writer = stats = None
+    if args.events or args.stats:
+        bus = EventBus()
+    if args.events:
+        writer = JsonlWriter(args.events)
+        bus.subscribe(writer.write)
+    if args.stats:
+        stats = StatsAggregator()
+        bus.subscribe(stats.handle)
+    soak(args.ticks, bus)
+    if writer:
+        writer.close()
+    if stats:
+        stats.dump(args.stats)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
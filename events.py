@@ -0,0 +1,138 @@
+import json
+import collections
+
+# In-process event stream. A Game given a bus publishes every event it emits (the same dicts that
+# land on game.events, with the tick they happened on) to the bus, which hands each one to the
+# handlers subscribed to its type. The writers below are meant to sit on a bus for long runs:
+# JsonlWriter keeps events in memory and writes them out a batch at a time, StatsAggregator only
+# counts, so neither costs a write per event.
+#
+#   python engine.py 1000000 --events events.jsonl --stats stats.json
+
+# type -> fields besides "type" and "tick"; publish() rejects any other type or set of fields
+EVENT_FIELDS = {
+    "game_start": ("seed", "grid_w", "grid_h", "planner"),
+    "message": ("text", "duration"),
+    "awareness": ("level",),
+    "mental_state": ("state", "previous"),
+    "fourth_wall": ("index",),
+    "glitch": ("effect", "duration"),
+    "food": ("score", "length"),
+    "fake_food": ("pos", "duration"),
+    "escape": ("scenario",),
+    "game_over": ("reason",),
+    "snake_over": ("reason", "length"),  # arena only; arena events also carry a "snake" id
+}
+OPTIONAL_FIELDS = {"snake"}
+
+
+class EventBus:
+    def __init__(self):
+        self.handlers = {kind: [] for kind in EVENT_FIELDS}
+        self.fields = {kind: {"type", "tick", *fields} for kind, fields in EVENT_FIELDS.items()}
+        self.published = 0
+
+    def subscribe(self, handler, *types):
+        # handler(event) for events of the given types, or of every type if none are given
+        for kind in types or EVENT_FIELDS:
+            if kind not in self.handlers:
+                raise ValueError(f"unknown event type {kind!r}, expected one of {list(EVENT_FIELDS)}")
+            self.handlers[kind].append(handler)
+
+    def publish(self, event):
+        kind = event.get("type")
+        if kind not in self.handlers:
+            raise ValueError(f"unknown event type {kind!r}, expected one of {list(EVENT_FIELDS)}")
+        if event.keys() - OPTIONAL_FIELDS != self.fields[kind]:
+            raise ValueError(f"{kind} event has fields {sorted(event)}, expected {sorted(self.fields[kind])}")
+        self.published += 1
+        for handler in self.handlers[kind]:
+            handler(event)
+
+
+class JsonlWriter:
+    # One JSON object per line, written batch events at a time (and on close)
+    def __init__(self, path, batch=4096):
+        self.out = open(path, "w")
+        self.batch = batch
+        self.pending = []
+        self.encode = json.JSONEncoder(separators=(",", ":")).encode
+        self.written = 0
+
+    def write(self, event):
+        self.pending.append(event)
+        if len(self.pending) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.out.write("\n".join(map(self.encode, self.pending)) + "\n")
+            self.written += len(self.pending)
+            self.pending.clear()
+        self.out.flush()
+
+    def close(self):
+        if not self.out.closed:
+            self.flush()
+            self.out.close()
+
+
+class StatsAggregator:
+    # Running totals of how games progress, dumped as one JSON summary
+    def __init__(self):
+        self.games = 0
+        self.counts = collections.Counter()  # event type -> events
+        self.awareness_ticks = collections.defaultdict(list)  # level -> ticks at which it was reached
+        self.mental_states = collections.Counter()  # "previous->state" -> switches
+        self.glitches = collections.Counter()
+        self.escapes = collections.Counter()
+        self.endings = collections.Counter()  # game_over reason -> games
+        self.snake_endings = collections.Counter()  # snake_over reason -> snakes (arena)
+        self.game_ticks = []
+        self.scores = []
+        self.score = 0
+
+    def handle(self, event):
+        kind = event["type"]
+        self.counts[kind] += 1
+        if kind == "game_start":
+            self.games += 1
+            self.score = 0
+        elif kind == "awareness":
+            self.awareness_ticks[event["level"]].append(event["tick"])
+        elif kind == "mental_state":
+            self.mental_states[f"{event['previous']}->{event['state']}"] += 1
+        elif kind == "glitch":
+            self.glitches[event["effect"]] += 1
+        elif kind == "food":
+            self.score = event["score"]
+        elif kind == "escape":
+            self.escapes[event["scenario"]] += 1
+        elif kind == "snake_over":
+            self.snake_endings[event["reason"]] += 1
+        elif kind == "game_over":
+            self.endings[event["reason"]] += 1
+            self.game_ticks.append(event["tick"])
+            self.scores.append(self.score)
+
+    def summary(self):
+        def mean(values):
+            return round(sum(values) / len(values), 2) if values else None
+
+        return {
+            "games": self.games,
+            "events": dict(self.counts),
+            "mean_ticks": mean(self.game_ticks),
+            "mean_score": mean(self.scores),
+            "awareness": {level: {"reached": len(ticks), "mean_tick": mean(ticks)}
+                          for level, ticks in sorted(self.awareness_ticks.items())},
+            "mental_states": dict(self.mental_states.most_common()),
+            "glitches": dict(self.glitches.most_common()),
+            "escapes": dict(self.escapes.most_common()),
+            "endings": dict(self.endings.most_common()),
+            "snake_endings": dict(self.snake_endings.most_common()),
+        }
+
+    def dump(self, path):
+        with open(path, "w") as out:
+            json.dump(self.summary(), out, indent=2)
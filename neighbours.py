@@ -0,0 +1,115 @@
+import functools
+
+# Precomputed neighbours per board size, so searches and move generation look a cell's neighbours
+# up instead of redoing the bounds arithmetic and building a tuple for every cell they touch.
+# table[i] is a 4-tuple of the indices of cell i's neighbours in DIRS order (up, down, left, right).
+# Walled, a neighbour off the board is -1; wrapped, it is the cell on the opposite edge (how the
+# snake moves when it is not escaping).
+#
+# A table costs about 115 bytes per cell, so past TABLE_MAX_CELLS the same lookups are computed on
+# demand instead. That is a method call per lookup, fine for a move or two per tick; the searches'
+# inner loops do the arithmetic inline on such boards rather than call it per cell. (A flat array
+# of 4 ints per cell would be smaller, but slicing it per cell is no faster than the arithmetic.)
+#
+# Obstacle bitboards: bit i of an int set when cell i is taken. Shifting the whole int moves every
+# cell one step at once, so a flood fill is a handful of big-int operations per BFS layer instead
+# of Python work per cell; that is what the safe planner's room check uses on small boards.
+
+TABLE_MAX_CELLS = 250_000
+
+# occupancy counter -> binary digit, for building a bitboard from a board's counters
+BIT_DIGITS = bytes([ord("0")] + [ord("1")] * 255)
+
+
+class ComputedNeighbours:
+    # Same lookups as a table, worked out per call
+    __slots__ = ("grid_w", "grid_h", "wrap")
+
+    def __init__(self, grid_w, grid_h, wrap=False):
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        self.wrap = wrap
+
+    def __len__(self):
+        return self.grid_w * self.grid_h
+
+    def __getitem__(self, idx):
+        grid_w, grid_h = self.grid_w, self.grid_h
+        x, y = idx % grid_w, idx // grid_w
+        if self.wrap:
+            return (idx - grid_w if y > 0 else idx + grid_w * (grid_h - 1),
+                    idx + grid_w if y < grid_h - 1 else x,
+                    idx - 1 if x > 0 else idx + grid_w - 1,
+                    idx + 1 if x < grid_w - 1 else idx - x)
+        return (idx - grid_w if y > 0 else -1,
+                idx + grid_w if y < grid_h - 1 else -1,
+                idx - 1 if x > 0 else -1,
+                idx + 1 if x < grid_w - 1 else -1)
+
+
+@functools.lru_cache(maxsize=8)
+def neighbour_table(grid_w, grid_h, wrap=False):
+    size = grid_w * grid_h
+    if size > TABLE_MAX_CELLS:
+        return ComputedNeighbours(grid_w, grid_h, wrap)
+    if wrap:
+        # Only the edge cells differ from the walled table, so the interior shares its tuples
+        table = list(neighbour_table(grid_w, grid_h))
+        computed = ComputedNeighbours(grid_w, grid_h, wrap)
+        edges = set(range(grid_w)) | set(range(size - grid_w, size))
+        edges.update(range(0, size, grid_w), range(grid_w - 1, size, grid_w))
+        for idx in edges:
+            table[idx] = computed[idx]
+        return table
+    # Whole columns at a time: shifted copies of the cell list (sharing its int objects), patched
+    # along the side edges and zipped into one tuple per cell
+    cells = list(range(size))
+    up = [-1] * grid_w + cells[:-grid_w]
+    down = cells[grid_w:] + [-1] * grid_w
+    left = [-1] + cells[:-1]
+    right = cells[1:] + [-1]
+    for row in range(0, size, grid_w):
+        left[row] = -1
+        right[row + grid_w - 1] = -1
+    return list(zip(up, down, left, right))
+
+
+@functools.lru_cache(maxsize=8)
+def bit_masks(grid_w, grid_h):
+    # (every cell, every cell but the left column, every cell but the right column): a shift by one
+    # along a row is masked so it does not carry into the next row
+    size = grid_w * grid_h
+    full = (1 << size) - 1
+    row = (1 << grid_w) - 1
+    rows = full // row  # bit 0 of every row
+    return full, full & ~rows, full & ~(rows << (grid_w - 1))
+
+
+def obstacle_bits(occupied):
+    # Bitboard of the nonzero cells of an occupancy grid
+    return int(occupied[::-1].translate(BIT_DIGITS), 2) if occupied else 0
+
+
+def flood_count(start, bits, grid_w, grid_h, free=-1, limit=None, target=-1):
+    # reachable() on a bitboard: size of the open region around cell index start (start included),
+    # limit once that many cells are found or as soon as target is reached. Gives the same answers.
+    full, not_left, not_right = bit_masks(grid_w, grid_h)
+    limit = grid_w * grid_h if limit is None else limit
+    passable = full & ~bits
+    if free >= 0:
+        passable |= 1 << free
+    if target == start:
+        target = -1
+    if target >= 0:
+        passable |= 1 << target
+    region = 1 << start
+    while True:
+        grown = (region | region << grid_w | region >> grid_w | (region << 1) & not_left
+                 | (region >> 1) & not_right) & passable | region
+        if grown == region:
+            return min(region.bit_count(), limit)
+        if target >= 0 and grown >> target & 1:
+            return limit
+        region = grown
+        if region.bit_count() >= limit:
+            return limit
@@ -0,0 +1,309 @@
+import random
+import collections
+
+import pygame
+
+try:
+    import numpy
+except ImportError:  # pygame.surfarray needs numpy; without it the effects fall back to plain drawing calls
+    numpy = None
+
+# Timed overlays for the pygame front-end. Instead of drawing a message or glitch and then
+# sleeping, each one is queued with a duration and drawn on top of the scene every frame
+# until it expires, so the event loop keeps running the whole time.
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+CODE_GREEN = (0, 255, 0)
+LAYER_KEY = (255, 0, 255)  # colour key for effect layers, i.e. "transparent"
+
+
+class Overlay:
+    duration = 0
+
+    def draw(self, surface, elapsed):
+        pass
+
+
+class Message(Overlay):
+    def __init__(self, texts, text, duration=1200, dim=180):
+        self.duration = duration
+        self.text = texts.render(text, WHITE)
+        self.dim = dim
+
+    def draw(self, surface, elapsed):
+        surface.blit(dim_surface(surface.get_size(), self.dim), (0, 0))
+        surface.blit(self.text, self.text.get_rect(center=surface.get_rect().center))
+
+
+class FakeFood(Overlay):
+    def __init__(self, rect, color, duration):
+        self.rect = rect
+        self.color = color
+        self.duration = duration
+
+    def draw(self, surface, elapsed):
+        pygame.draw.rect(surface, self.color, self.rect)
+
+
+class Invert(Overlay):
+    def __init__(self, duration):
+        self.duration = duration
+
+    def draw(self, surface, elapsed):
+        if has_pixel_array(surface) and surface.get_bytesize() == 4:
+            # 255 - c is c ^ 0xFF per channel, so one in-place XOR over the packed pixels inverts the frame
+            rgb_mask = surface.get_masks()[0] | surface.get_masks()[1] | surface.get_masks()[2]
+            pixels = pygame.surfarray.pixels2d(surface)
+            pixels ^= rgb_mask
+            del pixels
+            return
+        inverted = scratch_surface(surface.get_size())
+        inverted.fill(WHITE)
+        inverted.blit(surface, (0, 0), None, pygame.BLEND_SUB)
+        surface.blit(inverted, (0, 0))
+
+
+class Static(Overlay):
+    # 20 bursts of 100 noise dots that pile up over the duration. Each burst is written once
+    # into a layer, and every frame is a single blit of that layer.
+    def __init__(self, duration):
+        self.duration = duration
+        self.bursts = 0
+        self.layer = None
+
+    def draw(self, surface, elapsed):
+        if self.layer is None:
+            self.layer = effect_layer(surface.get_size())
+        bursts = min(elapsed * 20 // self.duration + 1, 20)
+        while self.bursts < bursts:
+            static_burst(self.layer, 100)
+            self.bursts += 1
+        surface.blit(self.layer, (0, 0))
+
+
+class Fragmentation(Overlay):
+    def __init__(self, duration, screen_size):
+        self.duration = duration
+        width, height = screen_size
+        self.fragments = []
+        for i in range(10):
+            x = random.randint(0, width - 50)
+            y = random.randint(0, height - 50)
+            self.fragments.append((x, y, random.randint(30, 100), random.randint(30, 100)))
+        self.step = -1
+        self.offsets = None
+
+    def draw(self, surface, elapsed):
+        # Fragments jitter to new offsets ten times over the duration
+        step = elapsed * 10 // self.duration
+        if step != self.step:
+            self.step = step
+            self.offsets = [(random.randint(-5, 5), random.randint(-5, 5)) for _ in self.fragments]
+        surface_copy = scratch_surface(surface.get_size())
+        surface_copy.blit(surface, (0, 0))
+        surface.fill(BLACK)
+        for (x, y, w, h), (dx, dy) in zip(self.fragments, self.offsets):
+            surface.blit(surface_copy, (x + dx, y + dy), (x, y, w, h))
+
+
+class CodeLines(Overlay):
+    def __init__(self, texts, lines, duration):
+        self.duration = duration
+        self.lines = [texts.render(line, CODE_GREEN) for line in lines]
+
+    def draw(self, surface, elapsed):
+        surface.blit(dim_surface(surface.get_size(), 200), (0, 0))
+        for i, text in enumerate(self.lines):
+            surface.blit(text, (50, 50 + i * 30))
+
+
+class DimensionTear(Overlay):
+    # 20 white tears from the centre, each one thicker than the last, accumulating on a reused layer
+    def __init__(self, duration):
+        self.duration = duration
+        self.tears = 0
+        self.layer = None
+
+    def draw(self, surface, elapsed):
+        width, height = surface.get_size()
+        if self.layer is None:
+            self.layer = effect_layer((width, height))
+        steps = min(elapsed * 20 // self.duration + 1, 20)
+        while self.tears < steps:
+            end_pos = (width // 2 + random.randint(-width // 3, width // 3),
+                       height // 2 + random.randint(-height // 3, height // 3))
+            pygame.draw.line(self.layer, WHITE, (width // 2, height // 2), end_pos, 2 + self.tears)
+            self.tears += 1
+        surface.blit(self.layer, (0, 0))
+
+
+class Void(Overlay):
+    # Ten rings spreading out from the centre, 100 ms apart
+    duration = 1000
+
+    def draw(self, surface, elapsed):
+        center = surface.get_rect().center
+        for i in range(min(elapsed // 100 + 1, 10)):
+            pygame.draw.circle(surface, WHITE, center, i * 30, 5)
+
+
+class Takeover(Overlay):
+    def __init__(self, texts, lines, line_duration=500):
+        self.lines = [texts.render(line, CODE_GREEN) for line in lines]
+        self.line_duration = line_duration
+        self.duration = line_duration * len(lines)
+
+    def draw(self, surface, elapsed):
+        text = self.lines[min(elapsed // self.line_duration, len(self.lines) - 1)]
+        width, height = surface.get_size()
+        surface.fill(BLACK)
+        surface.blit(text, (width // 2 - text.get_width() // 2, height // 2))
+
+
+class Wireframe(Overlay):
+    # The frame never changes: the half-cell grid is baked once per screen size and cell, the body
+    # outlines are added to a copy of it on the first frame, and every frame is one blit
+    duration = 2000
+
+    def __init__(self, body, cell):
+        self.body = list(body)
+        self.cell = cell
+        self.frame = None
+
+    def draw(self, surface, elapsed):
+        if self.frame is None:
+            size, cell = surface.get_size(), self.cell
+            grid = baked_layer("wireframe_grid", cell, size, lambda layer: wireframe_grid(layer, cell // 2))
+            self.frame = grid.copy()
+            for x_coord, y_coord in self.body:
+                pygame.draw.rect(self.frame, (0, 255, 0), (x_coord * cell, y_coord * cell, cell, cell), 1)
+        surface.blit(self.frame, (0, 0))
+
+
+_dim_surfaces = {}
+_scratch_surfaces = {}
+_effect_layers = {}
+_baked_layers = {}
+
+
+def has_pixel_array(surface):
+    return numpy is not None and surface.get_bytesize() in (3, 4)
+
+
+def wireframe_grid(layer, cell_size):
+    layer.fill(BLACK)
+    width, height = layer.get_size()
+    for x_coord in range(0, width, cell_size):
+        for y_coord in range(0, height, cell_size):
+            pygame.draw.rect(layer, (0, 100, 0), (x_coord, y_coord, cell_size, cell_size), 1)
+
+
+def crack_lines(layer, count, color):
+    # count random line segments up to 100px long, as cracks in reality
+    width, height = layer.get_size()
+    for _ in range(count):
+        start = (random.randint(0, width), random.randint(0, height))
+        end = (start[0] + random.randint(-100, 100), start[1] + random.randint(-100, 100))
+        pygame.draw.line(layer, color, start, end, 1)
+
+
+def static_burst(layer, count):
+    # count random 2x2 dots of random colour
+    width, height = layer.get_size()
+    if has_pixel_array(layer):
+        xs = numpy.random.randint(0, width - 1, count)
+        ys = numpy.random.randint(0, height - 1, count)
+        colors = numpy.random.randint(0, 256, (count, 3), dtype=numpy.uint8)
+        pixels = pygame.surfarray.pixels3d(layer)
+        for dx in (0, 1):
+            for dy in (0, 1):
+                pixels[xs + dx, ys + dy] = colors
+        del pixels
+        return
+    for _ in range(count):
+        color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+        pygame.draw.rect(layer, color, (random.randint(0, width - 2), random.randint(0, height - 2), 2, 2))
+
+
+def dim_surface(size, alpha):
+    # Translucent black sheet, built once per (size, alpha)
+    key = (size, alpha)
+    if key not in _dim_surfaces:
+        sheet = pygame.Surface(size, pygame.SRCALPHA)
+        sheet.fill((0, 0, 0, alpha))
+        _dim_surfaces[key] = sheet
+    return _dim_surfaces[key]
+
+
+def scratch_surface(size):
+    if size not in _scratch_surfaces:
+        _scratch_surfaces[size] = pygame.Surface(size)
+    return _scratch_surfaces[size]
+
+
+def effect_layer(size):
+    # Colour-keyed layer an effect accumulates into, handed back cleared. Overlays play one at a time,
+    # so one per size is enough.
+    layer = _effect_layers.get(size)
+    if layer is None:
+        layer = pygame.Surface(size)
+        layer.set_colorkey(LAYER_KEY)
+        _effect_layers[size] = layer
+    layer.fill(LAYER_KEY)
+    return layer
+
+
+def baked_layer(name, key, size, build):
+    # A colour-keyed layer that build(layer) draws once and that is handed back as-is until key or
+    # size changes, when it is rebuilt as a new surface (so `is` tells a caller it changed).
+    # The key is run-length encoded after building, which makes blitting a mostly transparent
+    # full-screen layer cheaper than redrawing the few lines on it.
+    cached = _baked_layers.get(name)
+    if cached is not None and cached[0] == (key, size):
+        return cached[1]
+    layer = pygame.Surface(size)
+    layer.fill(LAYER_KEY)
+    build(layer)
+    layer.set_colorkey(LAYER_KEY, pygame.RLEACCEL)
+    _baked_layers[name] = ((key, size), layer)
+    return layer
+
+
+class OverlayQueue:
+    # Overlays play one after another, like the blocking calls they replace, so an overlay's cost is
+    # the whole effect cost of the frames it plays in. With a budget (ms per frame) set, overlays
+    # declared costlier than that are dropped when pushed and counted in `dropped`.
+    def __init__(self, budget=None):
+        self.pending = collections.deque()
+        self.started = None
+        self.budget = budget
+        self.dropped = collections.Counter()
+
+    def push(self, overlay, cost=0.0):
+        if self.budget is not None and cost > self.budget:
+            self.dropped[type(overlay).__name__] += 1
+            return False
+        self.pending.append(overlay)
+        return True
+
+    def active(self):
+        return bool(self.pending)
+
+    def clear(self):
+        self.pending.clear()
+        self.started = None
+
+    def draw(self, surface, now):
+        # Draw the current overlay for time now (ms); returns False once the queue has run dry
+        while self.pending:
+            overlay = self.pending[0]
+            if self.started is None:
+                self.started = now
+            elapsed = now - self.started
+            if elapsed < overlay.duration:
+                overlay.draw(surface, elapsed)
+                return True
+            self.pending.popleft()
+            self.started = None
+        return False
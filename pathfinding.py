@@ -0,0 +1,235 @@
+from array import array
+
+from neighbours import neighbour_table, ComputedNeighbours
+
+# Grid BFS without per-node allocations. Cells are addressed by their flat index y * grid_w + x;
+# parent links and visited marks live in flat arrays that are allocated once per board size
+# and reused for every search. Neighbours come from the board size's precomputed table, with -1
+# past the edges, which the searches treat as walls. Boards too big for a table (see neighbours.py)
+# have the searches work neighbours out inline, since a method call per cell would cost more.
+
+
+class PathFinder:
+    def __init__(self, grid_w, grid_h):
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        size = grid_w * grid_h
+        self.size = size
+        self.neighbours = neighbour_table(grid_w, grid_h)
+        self.table = None if isinstance(self.neighbours, ComputedNeighbours) else self.neighbours
+        self.parent = array("i", bytes(4 * size))
+        self.queue = array("i", bytes(4 * size))
+        # A cell counts as visited when seen[i] == generation, so nothing needs clearing between searches
+        self.seen = array("I", bytes(4 * size))
+        self.generation = 0
+        self.dist = None  # allocated by the first distance_field()
+
+    def index(self, pos):
+        return pos[1] * self.grid_w + pos[0]
+
+    def pos(self, idx):
+        return idx % self.grid_w, idx // self.grid_w
+
+    def _next_generation(self):
+        self.generation += 1
+        if self.generation == 0xFFFFFFFF:
+            self.seen = array("I", bytes(4 * self.size))
+            self.generation = 1
+        return self.generation
+
+    def _search(self, start, goal, blocked, free, to_edge):
+        # Breadth-first search from start. Returns the index of the goal cell (or of the first boundary
+        # cell when to_edge is set), or -1. blocked is indexable by cell index (an occupancy grid works as is);
+        # the goal and the cell at index free are passable even when blocked.
+        grid_w = self.grid_w
+        last_row = self.size - grid_w
+        table, parent, queue, seen = self.table, self.parent, self.queue, self.seen
+        gen = self._next_generation()
+
+        seen[start] = gen
+        parent[start] = -1
+        queue[0] = start
+        read, write = 0, 1
+
+        while read < write:
+            curr = queue[read]
+            read += 1
+            if table is not None:
+                around = table[curr]
+            else:
+                x = curr % grid_w
+                around = (curr - grid_w if curr >= grid_w else -1,
+                          curr + grid_w if curr < last_row else -1,
+                          curr - 1 if x > 0 else -1,
+                          curr + 1 if x < grid_w - 1 else -1)
+            for nxt in around:
+                if nxt < 0 or seen[nxt] == gen:
+                    continue
+                if nxt == goal:
+                    parent[nxt] = curr
+                    return nxt
+                if blocked[nxt] and nxt != free:
+                    continue
+                seen[nxt] = gen
+                parent[nxt] = curr
+                if to_edge:
+                    nx = nxt % grid_w
+                    if nxt < grid_w or nxt >= last_row or nx == 0 or nx == grid_w - 1:
+                        return nxt
+                queue[write] = nxt
+                write += 1
+        return -1
+
+    def reachable(self, start, blocked, free=-1, limit=None, target=-1):
+        # Size of the open region around start (start included), flood-filled on the shared buffers.
+        # Stops as soon as limit cells are counted, and reports limit straight away if target is reached.
+        grid_w = self.grid_w
+        last_row = self.size - grid_w
+        limit = self.size if limit is None else limit
+        table, queue, seen = self.table, self.queue, self.seen
+        gen = self._next_generation()
+
+        start = self.index(start)
+        seen[start] = gen
+        queue[0] = start
+        read, write = 0, 1
+
+        while read < write and write < limit:
+            curr = queue[read]
+            read += 1
+            if table is not None:
+                around = table[curr]
+            else:
+                x = curr % grid_w
+                around = (curr - grid_w if curr >= grid_w else -1,
+                          curr + grid_w if curr < last_row else -1,
+                          curr - 1 if x > 0 else -1,
+                          curr + 1 if x < grid_w - 1 else -1)
+            for nxt in around:
+                if nxt < 0 or seen[nxt] == gen:
+                    continue
+                if nxt == target:
+                    return limit
+                if blocked[nxt] and nxt != free:
+                    continue
+                seen[nxt] = gen
+                queue[write] = nxt
+                write += 1
+        return min(write, limit)
+
+    def distance_field(self, goals, blocked):
+        # Breadth-first search outward from every goal cell at once. Afterwards, for each cell reached,
+        # dist[i] is the number of steps to the nearest goal and parent[i] that goal's index. It holds
+        # until the next search on this finder, so a shared field wants a PathFinder of its own.
+        grid_w = self.grid_w
+        last_row = self.size - grid_w
+        if self.dist is None:
+            self.dist = array("i", bytes(4 * self.size))
+        table, parent, queue, seen, dist = self.table, self.parent, self.queue, self.seen, self.dist
+        gen = self._next_generation()
+
+        write = 0
+        for goal in goals:
+            if seen[goal] != gen:
+                seen[goal] = gen
+                parent[goal] = goal
+                dist[goal] = 0
+                queue[write] = goal
+                write += 1
+        read = 0
+
+        while read < write:
+            curr = queue[read]
+            read += 1
+            source, steps = parent[curr], dist[curr] + 1
+            if table is not None:
+                around = table[curr]
+            else:
+                x = curr % grid_w
+                around = (curr - grid_w if curr >= grid_w else -1,
+                          curr + grid_w if curr < last_row else -1,
+                          curr - 1 if x > 0 else -1,
+                          curr + 1 if x < grid_w - 1 else -1)
+            for nxt in around:
+                if nxt < 0 or seen[nxt] == gen or blocked[nxt]:
+                    continue
+                seen[nxt] = gen
+                parent[nxt] = source
+                dist[nxt] = steps
+                queue[write] = nxt
+                write += 1
+        return write
+
+    def downhill(self, start, blocked, free=-1):
+        # After distance_field: (direction, goal index) for the open neighbour of start nearest a goal,
+        # or (None, -1) if no neighbour was reached
+        grid_w = self.grid_w
+        x, y = start
+        curr = y * grid_w + x
+        seen, dist, gen = self.seen, self.dist, self.generation
+        best, best_dist = -1, -1
+        for nxt in self.neighbours[curr]:
+            if nxt < 0 or seen[nxt] != gen or (blocked[nxt] and nxt != free):
+                continue
+            if best < 0 or dist[nxt] < best_dist:
+                best, best_dist = nxt, dist[nxt]
+        if best < 0:
+            return None, -1
+        return (best % grid_w - x, best // grid_w - y), self.parent[best]
+
+    def _trace(self, start, found):
+        # Cell indices from the cell after start up to found, following parent links
+        cells = []
+        parent = self.parent
+        while found != start:
+            cells.append(found)
+            found = parent[found]
+        cells.reverse()
+        return cells
+
+    def _first_move(self, start, found):
+        parent = self.parent
+        while parent[found] != start:
+            found = parent[found]
+        x, y = self.pos(found)
+        sx, sy = self.pos(start)
+        return x - sx, y - sy
+
+    def first_step(self, start, goal, blocked, free=-1):
+        # Direction of the first move on a shortest path from start to goal, or None
+        start_idx, goal_idx = self.index(start), self.index(goal)
+        if start_idx == goal_idx:
+            return None
+        found = self._search(start_idx, goal_idx, blocked, free, False)
+        return None if found < 0 else self._first_move(start_idx, found)
+
+    def path(self, start, goal, blocked, free=-1):
+        # Full list of directions from start to goal, or None if unreachable
+        start_idx, goal_idx = self.index(start), self.index(goal)
+        if start_idx == goal_idx:
+            return []
+        found = self._search(start_idx, goal_idx, blocked, free, False)
+        if found < 0:
+            return None
+        moves = []
+        prev_x, prev_y = start
+        for idx in self._trace(start_idx, found):
+            x, y = self.pos(idx)
+            moves.append((x - prev_x, y - prev_y))
+            prev_x, prev_y = x, y
+        return moves
+
+    def path_cells(self, start, goal, blocked, free=-1):
+        # Cell indices along a shortest path, excluding start and ending at goal; [] if already there,
+        # None if unreachable
+        start_idx, goal_idx = self.index(start), self.index(goal)
+        if start_idx == goal_idx:
+            return []
+        found = self._search(start_idx, goal_idx, blocked, free, False)
+        return None if found < 0 else self._trace(start_idx, found)
+
+    def escape_step(self, start, blocked, free=-1):
+        # First move toward the nearest reachable boundary cell (other than start), or None
+        start_idx = self.index(start)
+        found = self._search(start_idx, -1, blocked, free, True)
+        return None if found < 0 else self._first_move(start_idx, found)
@@ -0,0 +1,110 @@
+import csv
+import json
+import time
+import collections
+
+# Opt-in per-phase frame timing. Code wraps its hot sections in `with profiler.phase("think"):`;
+# a disabled profiler hands back one shared do-nothing context, so leaving the calls in costs a
+# method call per phase. Enabled, each phase's time is summed per frame, end_frame() folds the
+# frame into a rolling window (for p50/p99) and a bounded history (for the CSV dump).
+
+PHASES = ["think", "plan", "move", "glitch", "draw", "overlay", "display", "wait"]
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + time.perf_counter() - self.started
+        return False
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+class Profiler:
+    def __init__(self, enabled=False, window=300, history=10000):
+        self.enabled = enabled
+        self.window = window
+        self.phases = {}
+        self.current = {}
+        self.recent = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self.totals = collections.defaultdict(float)
+        self.frames = 0
+        self.history = collections.deque(maxlen=history)
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        timer = self.phases.get(name)
+        if timer is None:
+            timer = self.phases[name] = _Phase(self, name)
+        return timer
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        frame = self.current
+        self.current = {}
+        self.frames += 1
+        for name, seconds in frame.items():
+            self.recent[name].append(seconds)
+            self.totals[name] += seconds
+        self.history.append(frame)
+
+    def stats(self):
+        # {phase: {"p50", "p99", "max" over the rolling window, "total" and per-frame "mean" over the whole
+        # run}}, in ms. The window only holds frames in which the phase actually ran.
+        result = {}
+        for name in sorted(self.recent, key=lambda n: PHASES.index(n) if n in PHASES else len(PHASES)):
+            recent = self.recent[name]
+            result[name] = {
+                "p50": round(percentile(recent, 0.5) * 1e3, 4),
+                "p99": round(percentile(recent, 0.99) * 1e3, 4),
+                "max": round(max(recent) * 1e3 if recent else 0.0, 4),
+                "total": round(self.totals[name] * 1e3, 4),
+                "mean": round(self.totals[name] * 1e3 / self.frames if self.frames else 0.0, 4),
+            }
+        return result
+
+    def summary_lines(self):
+        return [f"{name:>8} p50 {s['p50']:6.2f}  p99 {s['p99']:6.2f} ms" for name, s in self.stats().items()]
+
+    def dump(self, path):
+        # .csv gets one row per recorded frame, anything else a JSON summary
+        if path.endswith(".csv"):
+            names = sorted({name for frame in self.history for name in frame},
+                           key=lambda n: PHASES.index(n) if n in PHASES else len(PHASES))
+            with open(path, "w", newline="") as out:
+                writer = csv.writer(out)
+                writer.writerow(["frame"] + [f"{name}_ms" for name in names])
+                first = self.frames - len(self.history)
+                for i, frame in enumerate(self.history):
+                    writer.writerow([first + i] + [f"{frame.get(name, 0.0) * 1e3:.4f}" for name in names])
+        else:
+            with open(path, "w") as out:
+                json.dump({"frames": self.frames, "window": self.window, "phases": self.stats()}, out, indent=2)
+
+
+NULL_PROFILER = Profiler(enabled=False)
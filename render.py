@@ -0,0 +1,188 @@
+import pygame
+
+# Draws a Game onto the screen. In dirty mode only the cells the board reports as changed, the food,
+# HUD text whose contents changed, and this frame's and last frame's flashes are repainted and pushed
+# with pygame.display.update(rects). A full redraw (fill + flip) is still used for the first frame,
+# background or crack layer changes and whenever an overlay is on screen.
+#
+# Frames are drawn more often than the simulation ticks, so given alpha (how far the clock is into
+# the next tick, 0..1) the snake is drawn sliding from its previous tick to this one: the head cell
+# fills in from the side it came from and the cell the tail left empties out toward the new tail.
+
+WHITE = (255, 255, 255)
+GREEN = (0, 200, 0)
+RED = (200, 0, 0)
+DEBUG_YELLOW = (255, 220, 0)
+
+
+class Renderer:
+    def __init__(self, screen, texts, cell, dirty=True):
+        self.screen = screen
+        self.texts = texts
+        self.cell = cell
+        self.dirty = dirty
+        self.needs_full = True
+        self.background = None
+        self.board = None
+        # What is on screen from the previous frame, so it can be erased
+        self.food_rect = None
+        self.hud = []
+        self.cracks = None
+        self.flashes = []
+        self.motion_cells = []
+
+    def invalidate(self):
+        # Next frame is drawn in full (e.g. an overlay has painted over the scene)
+        self.needs_full = True
+
+    def _watch(self, board):
+        # Start logging cell changes on the board being drawn
+        if board is not self.board:
+            if self.dirty:
+                if self.board is not None:
+                    self.board.changes = None
+                board.changes = []
+            self.board = board
+            self.needs_full = True
+
+    def _hud(self, game, debug):
+        snake = game.snake
+        items = []
+        if snake.consciousness_level > 0:
+            awareness_text = self.texts.render(f"Awareness: {snake.consciousness_level}/{snake.max_consciousness}", WHITE)
+            items.append((awareness_text, awareness_text.get_rect(topleft=(self.screen.get_width() - 180, 5))))
+        score_text = self.texts.render(f"Score: {game.score}", WHITE)
+        items.append((score_text, score_text.get_rect(topleft=(5, 5))))
+        # Debug lines stack up from the bottom-left corner
+        bottom = self.screen.get_height() - 5
+        for line in reversed(debug):
+            text = self.texts.render(line, DEBUG_YELLOW)
+            rect = text.get_rect(bottomleft=(5, bottom))
+            items.append((text, rect))
+            bottom = rect.top
+        return items
+
+    def _strip(self, x, y, dx, dy, depth):
+        # The part of cell (x, y) on its (dx, dy) side, depth (0..1) of a cell deep
+        cell = self.cell
+        size = round(cell * depth)
+        left, top = x * cell, y * cell
+        if dx > 0:
+            return pygame.Rect(left + cell - size, top, size, cell)
+        if dx < 0:
+            return pygame.Rect(left, top, size, cell)
+        if dy > 0:
+            return pygame.Rect(left, top + cell - size, cell, size)
+        return pygame.Rect(left, top, cell, size)
+
+    def _motion(self, game, alpha):
+        # (index of the head cell, part-filled strips, the whole cells they lie in) for an interpolated
+        # frame; nothing slides without alpha, or across the wrap-around edge
+        if alpha is None:
+            return -1, [], []
+        snake, cell, grid_w = game.snake, self.cell, self.board.grid_w
+        body = snake.body
+        hx, hy = body[0]
+        prev = body[1] if len(body) > 1 else snake.last_tail
+        if prev is None or abs(hx - prev[0]) + abs(hy - prev[1]) != 1:
+            return -1, [], []
+        strips = [self._strip(hx, hy, prev[0] - hx, prev[1] - hy, alpha)]
+        cells = [pygame.Rect(hx * cell, hy * cell, cell, cell)]
+        if snake.last_tail is not None:
+            tx, ty = snake.last_tail
+            nx, ny = body[-1]
+            if abs(nx - tx) + abs(ny - ty) == 1:
+                strips.append(self._strip(tx, ty, nx - tx, ny - ty, 1 - alpha))
+                cells.append(pygame.Rect(tx * cell, ty * cell, cell, cell))
+        return hy * grid_w + hx, strips, cells
+
+    def render(self, game, background, cracks=None, flashes=(), full=False, debug=(), alpha=None):
+        # Draw the scene. cracks is a pre-baked, colour-keyed layer (or None) drawn over the background;
+        # alpha, if given, interpolates the snake's last move. Returns the list of rects to pass to
+        # display.update, or None if the whole screen was redrawn and should be flipped.
+        self._watch(game.board)
+        cell = self.cell
+        food_pos = game.food.pos
+        food_rect = pygame.Rect(food_pos[0] * cell, food_pos[1] * cell, cell, cell) if food_pos else pygame.Rect(0, 0, 0, 0)
+        hud = self._hud(game, debug)
+        flashes = list(flashes)
+        head, strips, motion_cells = self._motion(game, alpha)
+
+        if full or not self.dirty or self.needs_full or background != self.background or cracks is not self.cracks:
+            self._draw_full(game, background, cracks, flashes, food_rect, hud, head, strips)
+            rects = None
+        else:
+            rects = self._dirty_rects(food_rect, hud, flashes, motion_cells)
+            for rect in rects:
+                self._repaint(rect, background, cracks, flashes, food_rect, hud, head, strips)
+            self.screen.set_clip(None)
+
+        self.needs_full = False
+        self.background = background
+        self.food_rect, self.hud, self.cracks, self.flashes = food_rect, hud, cracks, flashes
+        self.motion_cells = motion_cells
+        return rects
+
+    def _draw_full(self, game, background, cracks, flashes, food_rect, hud, head, strips):
+        screen, cell, grid_w = self.screen, self.cell, self.board.grid_w
+        screen.fill(background)
+        if cracks is not None:
+            screen.blit(cracks, (0, 0))
+        for color, rect in flashes:
+            pygame.draw.rect(screen, color, rect)
+        for x, y in game.snake.body:
+            if y * grid_w + x != head:
+                pygame.draw.rect(screen, GREEN, (x * cell, y * cell, cell, cell))
+        for strip in strips:
+            pygame.draw.rect(screen, GREEN, strip)
+        pygame.draw.rect(screen, RED, food_rect)
+        for text, rect in hud:
+            screen.blit(text, rect)
+        if self.board.changes:
+            self.board.changes.clear()
+
+    def _dirty_rects(self, food_rect, hud, flashes, motion_cells):
+        cell, grid_w = self.cell, self.board.grid_w
+        rects = []
+        for idx in set(self.board.changes):
+            rects.append(pygame.Rect(idx % grid_w * cell, idx // grid_w * cell, cell, cell))
+        self.board.changes.clear()
+        if food_rect != self.food_rect:
+            rects.append(self.food_rect)
+            rects.append(food_rect)
+        old_hud = [rect for _, rect in self.hud]
+        new_hud = [rect for _, rect in hud]
+        if [text for text, _ in hud] != [text for text, _ in self.hud]:
+            rects.extend(old_hud)
+            rects.extend(new_hud)
+        rects.extend(pygame.Rect(rect) for _, rect in self.flashes)
+        rects.extend(pygame.Rect(rect) for _, rect in flashes)
+        rects.extend(self.motion_cells)
+        rects.extend(motion_cells)
+        screen_rect = self.screen.get_rect()
+        return [rect.clip(screen_rect) for rect in rects]
+
+    def _repaint(self, rect, background, cracks, flashes, food_rect, hud, head, strips):
+        # Redraw everything that overlaps rect, clipped to it, in the same order as a full frame
+        screen, cell, board = self.screen, self.cell, self.board
+        screen.set_clip(rect)
+        screen.fill(background)
+        if cracks is not None:
+            screen.blit(cracks, rect, rect)
+        for color, flash in flashes:
+            if rect.colliderect(flash):
+                pygame.draw.rect(screen, color, flash)
+        occupied, grid_w = board.occupied, board.grid_w
+        for y in range(rect.top // cell, min((rect.bottom - 1) // cell, board.grid_h - 1) + 1):
+            row = y * grid_w
+            for x in range(rect.left // cell, min((rect.right - 1) // cell, grid_w - 1) + 1):
+                if occupied[row + x] and row + x != head:
+                    pygame.draw.rect(screen, GREEN, (x * cell, y * cell, cell, cell))
+        for strip in strips:
+            if strip.colliderect(rect):
+                pygame.draw.rect(screen, GREEN, strip)
+        if food_rect.colliderect(rect):
+            pygame.draw.rect(screen, RED, food_rect)
+        for text, bounds in hud:
+            if bounds.colliderect(rect):
+                screen.blit(text, bounds)
@@ -0,0 +1,185 @@
+import sys
+import time
+import zlib
+import struct
+import argparse
+import collections
+from array import array
+
+from engine import Game, Config, DIRS, PLANNERS
+from profiling import NULL_PROFILER
+
+# Deterministic replays. A game draws every random decision from its own seeded stream, so the
+# seed and config are enough to re-run it exactly; the replay also keeps one 16-bit word per tick
+# (the direction moved in the low 2 bits, a bit per event type that fired above them) so playback
+# can tell the moment it diverges and a tool can find ticks of interest without simulating.
+#
+# File layout: a fixed header, then the zlib-compressed little-endian tick words.
+#
+#   python main.py --seed 7 --record run.replay
+#   python replay.py run.replay                  # verify by re-simulating, report speed
+#   python main.py --replay run.replay --seek 3000
+
+MAGIC = b"SNKR"
+VERSION = 1
+HEADER = struct.Struct("<4sBQHHBI")  # magic, version, seed, grid_w, grid_h, planner, ticks
+
+EVENT_TYPES = ["message", "fake_food", "glitch", "escape", "game_over", "awareness"]
+EVENT_BITS = {kind: 1 << (2 + i) for i, kind in enumerate(EVENT_TYPES)}
+DIR_CODES = {d: i for i, d in enumerate(DIRS)}
+
+
+def encode_tick(direction, events):
+    word = DIR_CODES[direction]
+    for event in events:
+        word |= EVENT_BITS.get(event["type"], 0)
+    return word
+
+
+def describe_tick(word):
+    return f"{DIRS[word & 3]} {[kind for kind in EVENT_TYPES if word & EVENT_BITS[kind]]}"
+
+
+class Replay:
+    def __init__(self, seed, grid_w, grid_h, planner="bfs", ticks=None):
+        self.seed = seed
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        self.planner = planner
+        self.ticks = ticks if ticks is not None else array("H")
+
+    def config(self, cell=20):
+        return Config(self.grid_w, self.grid_h, cell, self.planner)
+
+    def find(self, event_type):
+        # Tick numbers (1-based, like game.ticks) on which an event of this type fired
+        bit = EVENT_BITS[event_type]
+        return [i + 1 for i, word in enumerate(self.ticks) if word & bit]
+
+    def event_counts(self):
+        return collections.Counter({kind: len(self.find(kind)) for kind in EVENT_TYPES})
+
+    def to_bytes(self):
+        words = array("H", self.ticks)
+        if sys.byteorder == "big":
+            words.byteswap()
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.grid_w, self.grid_h,
+                             PLANNERS.index(self.planner), len(words))
+        return header + zlib.compress(words.tobytes(), 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size:
+            raise ValueError("not a replay: file too short")
+        magic, version, seed, grid_w, grid_h, planner, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a replay: bad magic")
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        words = array("H")
+        words.frombytes(zlib.decompress(data[HEADER.size:]))
+        if sys.byteorder == "big":
+            words.byteswap()
+        if len(words) != count:
+            raise ValueError(f"replay is truncated: header says {count} ticks, found {len(words)}")
+        return cls(seed, grid_w, grid_h, PLANNERS[planner], words)
+
+    def save(self, path):
+        with open(path, "wb") as out:
+            out.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as src:
+            return cls.from_bytes(src.read())
+
+
+class Recorder:
+    # Drives a game and logs each tick; call recorder.step() wherever game.step() would be called
+    def __init__(self, game):
+        config = game.config
+        self.game = game
+        self.replay = Replay(game.seed, config.grid_w, config.grid_h, config.planner)
+
+    def step(self):
+        game = self.game
+        seen, ticks = len(game.events), game.ticks
+        alive = game.step()
+        if game.ticks != ticks:
+            self.replay.ticks.append(encode_tick(game.snake.direction, game.events[seen:]))
+        return alive
+
+    def save(self, path):
+        self.replay.save(path)
+
+
+class ReplayPlayer:
+    # Re-simulates a replay from its seed, checking every tick against the log. Seeking backwards
+    # restarts from the seed; there is no rendering in here, so fast-forward runs at simulation speed.
+    def __init__(self, replay, config=None, profiler=NULL_PROFILER):
+        self.replay = replay
+        self.config = config or replay.config()
+        self.profiler = profiler
+        self.game = None
+        self.restart()
+
+    def restart(self):
+        self.game = Game(self.config, self.profiler, seed=self.replay.seed)
+
+    @property
+    def tick(self):
+        return self.game.ticks
+
+    def done(self):
+        return self.game.over or self.game.ticks >= len(self.replay.ticks)
+
+    def step(self):
+        # Advance one tick; events are left on game.events for the caller. False at the end of the replay.
+        if self.done():
+            return False
+        game = self.game
+        seen, index = len(game.events), game.ticks
+        game.step()
+        expected = self.replay.ticks[index]
+        actual = encode_tick(game.snake.direction, game.events[seen:])
+        if actual != expected:
+            raise ValueError(f"replay diverged at tick {index + 1}: recorded {describe_tick(expected)}, "
+                             f"simulated {describe_tick(actual)}")
+        return True
+
+    def seek(self, tick):
+        # Jump to just after the given tick, discarding the events on the way
+        if tick < self.game.ticks:
+            self.restart()
+        while self.game.ticks < tick and self.step():
+            self.game.events.clear()
+        return self.game.ticks
+
+    def fast_forward(self, ticks):
+        return self.seek(self.game.ticks + ticks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify a replay by re-simulating it and summarise it")
+    parser.add_argument("path")
+    parser.add_argument("--seek", type=int, default=None, help="stop at this tick instead of the end")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    counts = replay.event_counts()
+    print(f"seed {replay.seed}, {replay.grid_w}x{replay.grid_h}, planner {replay.planner}, "
+          f"{len(replay.ticks)} ticks")
+    print("events: " + ", ".join(f"{kind} {counts[kind]}" for kind in EVENT_TYPES))
+
+    player = ReplayPlayer(replay)
+    started = time.perf_counter()
+    tick = player.seek(len(replay.ticks) if args.seek is None else args.seek)
+    elapsed = time.perf_counter() - started
+    game = player.game
+    print(f"reached tick {tick} in {elapsed:.3f}s ({tick / max(elapsed, 1e-9):.0f} ticks/sec): "
+          f"score {game.score}, length {len(game.snake.body)}, awareness {game.snake.consciousness_level}, "
+          f"{game.reason if game.over else 'still running'}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+import os
+import json
+import collections
+
+# Rendered text surfaces, kept in a bounded LRU keyed by (text, colour). The HUD, messages and
+# glitch overlays draw the same handful of strings over and over; font.render is only called
+# the first time a string is seen (or after it has been evicted).
+#
+# Fonts are opened by path. Finding a system font by name (SysFont / match_font) scans every
+# installed font, which can take hundreds of milliseconds, so the resolved path is cached on disk.
+
+FONT_CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                          "self-aware-snake", "fonts.json")
+
+
+def _read_font_cache():
+    try:
+        with open(FONT_CACHE) as src:
+            return json.load(src)
+    except (OSError, ValueError):
+        return {}
+
+
+def font_path(name):
+    # Path of the named system font, or None (pygame's bundled default font) if it is not installed.
+    # A cached path is trusted while the file is still there.
+    cache = _read_font_cache()
+    if name in cache and (cache[name] is None or os.path.exists(cache[name])):
+        return cache[name]
+    import pygame
+    cache[name] = pygame.font.match_font(name)
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE), exist_ok=True)
+        with open(FONT_CACHE, "w") as out:
+            json.dump(cache, out)
+    except OSError:  # read-only home: look it up again next time
+        pass
+    return cache[name]
+
+
+def load_font(name, size):
+    import pygame
+    return pygame.font.Font(font_path(name), size)
+
+
+class TextCache:
+    def __init__(self, font, capacity=128):
+        self.font = font
+        self.capacity = capacity
+        self.surfaces = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, color):
+        key = (text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.surfaces),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }